@@ -0,0 +1,142 @@
+"""Benchmark the window manager hot paths on a simulated desktop
+
+Runs headless (no pywin32/psutil/customtkinter needed):
+
+    python benchmarks/bench_core.py --windows 2000 --layout-size 30
+
+--no-numpy times the pure-Python matching path even if NumPy is installed.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main as window_manager  # noqa: E402
+from main import (SIMULATED_APPS, SIMULATED_WORDS, SimulatedBackend, WindowManagerCore,  # noqa: E402
+                  max_weight_assignment_matrix, max_weight_assignment_rows, np)
+
+
+def timed(label, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000:10.2f} ms")
+    return result
+
+
+def single_app_desktop(window_count, seed, processes=4):
+    """Only Chrome windows, the densest case for one-to-one assignment"""
+    backend = SimulatedBackend()
+    rng = random.Random(seed)
+    process_name, exe_path, class_name, templates, _ = SIMULATED_APPS[0]
+    pids = [1000 + 4 * i for i in range(processes)]
+    for pid in pids:
+        backend.add_process(pid, process_name, exe_path)
+    for _ in range(window_count):
+        title = rng.choice(templates).format(**{key: rng.choice(words) for key, words in SIMULATED_WORDS.items()})
+        x, y = rng.randint(0, 1000), rng.randint(0, 400)
+        backend.add_window(title, rng.choice(pids), class_name, (x, y, x + 800, y + 600))
+    return backend
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--windows", type=int, default=2000, help="number of synthetic windows")
+    parser.add_argument("--layout-size", type=int, default=30, help="windows per saved layout")
+    parser.add_argument("--layouts", type=int, default=100, help="saved layouts to preview")
+    parser.add_argument("--single-app", type=int, nargs=2, default=(200, 500), metavar=("ENTRIES", "WINDOWS"),
+                        help="size of the one-app layout assignment case")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--process-latency", type=float, default=0.0,
+                        help="seconds added to every process lookup")
+    parser.add_argument("--no-numpy", action="store_true", help="match without NumPy")
+    args = parser.parse_args()
+
+    global np
+    if args.no_numpy:
+        window_manager.np = np = None
+
+    latencies = None
+    if args.process_latency:
+        latencies = {"get_process_info": args.process_latency, "get_process_exe": args.process_latency}
+    backend = SimulatedBackend.synthetic(args.windows, seed=args.seed, latencies=latencies)
+    core = WindowManagerCore(backend)
+    print(f"Simulated desktop: {len(backend.windows)} windows, {len(backend.processes)} processes")
+
+    windows = timed("enumerate (get_windows)", core.get_windows)
+    timed("re-enumerate, unchanged", core.get_windows)
+    core.capture_snapshot()
+    for hwnd in list(backend.windows)[:10]:
+        x, y, right, bottom = backend.windows[hwnd].rect
+        backend.set_window_pos(hwnd, x + 10, y, right - x, bottom - y)
+    snapshot = timed("snapshot after 10 moves", core.capture_snapshot)
+    print(f"{'':<28} diff: {len(snapshot.diff.added)} added, {len(snapshot.diff.removed)} removed, "
+          f"{len(snapshot.diff.changed)} changed")
+    timed("classify app types",
+          lambda: [core.app_classifier.classify(w['process_name'].lower().replace('.exe', ''), w['title'].lower())
+                   for w in windows])
+    identifiers = timed("identify all windows",
+                        lambda: [core.create_smart_identifier(w) for w in windows])
+
+    rng = random.Random(args.seed)
+    layout = rng.sample(identifiers, min(args.layout_size, len(identifiers)))
+    matches = timed(f"match {len(layout)}-entry layout",
+                    lambda: [core.match_window_smart(identifier, windows) for identifier in layout])
+
+    layout_data = {f"window_{i}": {"identifier": identifier} for i, identifier in enumerate(layout)}
+    session = core.create_match_session(windows)
+    timed("assign layout (one-to-one)", core.match_layout, layout_data, session, 40)
+
+    layouts = [rng.sample(identifiers, min(args.layout_size, len(identifiers))) for _ in range(args.layouts)]
+
+    def preview_layouts():
+        session = core.create_match_session(windows)
+        return [sum(1 for identifier in entries if core.match_window_smart(identifier, session)[1] >= 40)
+                for entries in layouts]
+
+    timed(f"preview {len(layouts)} layouts", preview_layouts)
+
+    def apply_layout():
+        transaction = core.begin_moves()
+        for (match, score), identifier in zip(matches, layout):
+            if match:
+                transaction.move(match['hwnd'], identifier['position_x'], identifier['position_y'], 800, 600)
+        core.commit_moves(transaction)
+
+    timed("apply layout", apply_layout)
+    
+    # A browser restoring 40 tabs: re-read just the windows the events name
+    core.capture_snapshot()
+    backend.event_log.clear()
+    pid = windows[0]['pid']
+    for i in range(40):
+        backend.add_window(f"Restored tab {i} - Google Chrome", pid, "Chrome_WidgetWin_1")
+    timed("snapshot from 40 events", core.capture_snapshot, {hwnd for _, hwnd in backend.event_log})
+    
+    # One app everywhere: every entry is a candidate for every window
+    entries, window_count = args.single_app
+    chrome = WindowManagerCore(single_app_desktop(window_count, args.seed))
+    saved = WindowManagerCore(single_app_desktop(window_count, args.seed + 1))
+    saved_windows = rng.sample(saved.get_windows(), min(entries, window_count))
+    chrome_layout = {f"window_{i}": {"identifier": saved.create_smart_identifier(w)}
+                     for i, w in enumerate(saved_windows)}
+    chrome_session = chrome.create_match_session(chrome.get_windows())
+    label = f"{len(chrome_layout)}x{window_count}"
+    timed(f"match {label} one-app layout", chrome.match_layout, chrome_layout, chrome_session, 40)
+    identifiers = [entry["identifier"] for entry in chrome_layout.values()]
+    if np is not None:
+        matrix = chrome_session.vectorized_scorer().score_matrix(identifiers)
+        timed(f"  assignment only ({label})", max_weight_assignment_matrix, np.where(matrix >= 40, matrix, 0))
+    else:
+        row_scores = {row: chrome_session.row_scores(identifier, 40) for row, identifier in enumerate(identifiers)}
+        timed(f"  assignment only ({label})", max_weight_assignment_rows, row_scores)
+    
+    print("backend calls:", dict(sorted(backend.call_counts.items())))
+    print("identifier cache:", core.identifier_cache.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Measure the size and memory of a layout library, plain vs pooled format
+
+Saves a synthetic library (every layout picks windows from one simulated
+desktop, some of them moved) in the plain {name: layout} JSON format and
+the pooled format, then loads each back:
+
+    python benchmarks/bench_layouts.py --layouts 1000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import JournaledLayoutStore, LayoutPool, SimulatedBackend, WindowManagerCore  # noqa: E402
+
+
+def synthetic_library(core, windows, count, rng, max_size):
+    layouts = {}
+    for n in range(count):
+        layout = {}
+        for window in rng.sample(windows, rng.randint(2, max_size)):
+            x, y = window['rect'][0], window['rect'][1]
+            if rng.random() < 0.5:  # Window was elsewhere when this layout was saved
+                x, y = rng.randrange(0, 2560, 10), rng.randrange(0, 1440, 10)
+            identifier = core.create_smart_identifier(window).to_dict()
+            identifier['position_x'], identifier['position_y'] = x, y
+            layout[f"window_{len(layout)}"] = {
+                "identifier": identifier,
+                "position": {"x": x, "y": y, "width": window['width'], "height": window['height']}
+            }
+        layouts[f"Layout {n}"] = layout
+    return layouts
+
+
+def measure(load):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = load()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    return used
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--layouts", type=int, default=1000, help="saved layouts in the library")
+    parser.add_argument("--windows", type=int, default=300, help="windows on the simulated desktop")
+    parser.add_argument("--layout-size", type=int, default=15, help="most windows per layout")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    core = WindowManagerCore(SimulatedBackend.synthetic(args.windows, seed=args.seed))
+    layouts = synthetic_library(core, core.get_windows(), args.layouts, random.Random(args.seed),
+                                args.layout_size)
+    entries = sum(len(layout) for layout in layouts.values())
+    print(f"{len(layouts)} layouts, {entries} entries from {args.windows} windows")
+
+    with tempfile.TemporaryDirectory() as directory:
+        plain_path = os.path.join(directory, "plain.json")
+        pooled_path = os.path.join(directory, "pooled.json")
+        with open(plain_path, 'w', encoding='utf-8') as f:
+            json.dump(layouts, f, indent=2)  # As the library was saved before
+        with open(pooled_path, 'w', encoding='utf-8') as f:
+            json.dump(LayoutPool.encode(layouts), f, separators=(',', ':'))
+        compact_size = len(json.dumps(layouts, separators=(',', ':')))
+
+        plain_size = os.path.getsize(plain_path)
+        pooled_size = os.path.getsize(pooled_path)
+        print("file size")
+        for label, size in (("plain", plain_size), ("plain, no indent", compact_size), ("pooled", pooled_size)):
+            print(f"  {label:<18} {size / 1024:10.1f} KiB")
+        print(f"  pooled is {100 * (1 - pooled_size / plain_size):.0f}% smaller than plain "
+              f"({100 * (1 - pooled_size / compact_size):.0f}% smaller than plain without indent)")
+
+        def load_plain():
+            with open(plain_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        plain_memory = measure(load_plain)
+        pooled_memory = measure(lambda: JournaledLayoutStore(pooled_path))
+        store = JournaledLayoutStore(pooled_path)
+        if store.layouts != layouts:
+            sys.exit("pooled library does not load back equal")
+        print("memory after loading")
+        for label, used in (("plain", plain_memory), ("pooled", pooled_memory)):
+            print(f"  {label:<18} {used / 1024 / 1024:10.2f} MiB  {used / entries:8.0f} bytes/entry")
+        print(f"  pooled uses {100 * (1 - pooled_memory / plain_memory):.0f}% less memory "
+              f"({len(store.pool.identifiers)} distinct identifiers, {len(store.pool.strings)} strings)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Measure the per-window memory of window records and smart identifiers
+
+Compares the old per-window dicts against WindowRecord / SmartIdentifier
+on a synthetic desktop:
+
+    python benchmarks/bench_memory.py --windows 10000
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import SimulatedBackend, SmartIdentifier, WindowManagerCore, WindowRecord  # noqa: E402
+
+
+def fresh(text):
+    """A new str object with the same value, as every Win32/psutil call returns"""
+    return (text + ".")[:-1]
+
+
+def as_dicts(windows, identifiers):
+    """The 9-key window dicts and 11-key identifier dicts built before records existed"""
+    result = []
+    for w, i in zip(windows, identifiers):
+        rect = list(w.rect)
+        window_dict = {
+            'hwnd': w.hwnd,
+            'title': w.title,
+            'class_name': fresh(w.class_name),
+            'process_name': fresh(w.process_name),
+            'exe_path': fresh(w.exe_path),
+            'pid': w.pid,
+            'rect': rect,
+            'width': rect[2] - rect[0],
+            'height': rect[3] - rect[1]
+        }
+        identifier_dict = {
+            'app_type': fresh(i.app_type),
+            'process_name': fresh(w.process_name),
+            'class_name': fresh(w.class_name),
+            'title_keywords': list(i.title_keywords),
+            'clean_title': i.clean_title,
+            'title_length': i.title_length,
+            'original_title': w.title,
+            'process_pid': w.pid,
+            'exe_path': fresh(w.exe_path),
+            'position_x': rect[0],
+            'position_y': rect[1]
+        }
+        result.append((window_dict, identifier_dict))
+    return result
+
+
+def as_records(windows, identifiers):
+    result = []
+    for w, i in zip(windows, identifiers):
+        record = WindowRecord(w.hwnd, w.title, fresh(w.class_name), fresh(w.process_name),
+                              fresh(w.exe_path), w.pid, list(w.rect))
+        identifier = SmartIdentifier(fresh(i.app_type), fresh(w.process_name), fresh(w.class_name),
+                                     i.title_keywords, i.clean_title, i.title_length, w.title, w.pid,
+                                     fresh(w.exe_path), record.rect[0], record.rect[1])
+        result.append((record, identifier))
+    return result
+
+
+def measure(build, windows, identifiers):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build(windows, identifiers)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    return used
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--windows", type=int, default=10000, help="number of synthetic windows")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    core = WindowManagerCore(SimulatedBackend.synthetic(args.windows, seed=args.seed))
+    windows = core.get_windows()
+    identifiers = [core.create_smart_identifier(w) for w in windows]
+    print(f"{len(windows)} windows (title strings are shared by both layouts and not counted)")
+
+    dict_bytes = measure(as_dicts, windows, identifiers)
+    record_bytes = measure(as_records, windows, identifiers)
+    for label, used in (("dicts", dict_bytes), ("records", record_bytes)):
+        print(f"{label:<8} {used / 1024 / 1024:8.2f} MiB  {used / len(windows):8.0f} bytes/window")
+    print(f"records use {100 * (1 - record_bytes / dict_bytes):.0f}% less memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Compare the pure-Python and NumPy layout scoring engines
+
+Scores every saved identifier against every window of a simulated desktop,
+checks that both engines agree exactly and reports the speedup:
+
+    python benchmarks/bench_scoring.py --windows 1000 --identifiers 1000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import SimulatedBackend, VectorizedScorer, WindowManagerCore, np  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--windows", type=int, default=1000, help="windows on the current desktop")
+    parser.add_argument("--identifiers", type=int, default=1000, help="saved layout identifiers")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if np is None:
+        sys.exit("numpy is required for this benchmark")
+
+    core = WindowManagerCore(SimulatedBackend.synthetic(args.windows, seed=args.seed))
+    session = core.create_match_session(core.get_windows())
+    # Layouts saved on an earlier desktop: similar apps, different windows
+    saved = WindowManagerCore(SimulatedBackend.synthetic(args.identifiers, seed=args.seed + 1))
+    identifiers = [saved.create_smart_identifier(w) for w in saved.get_windows()]
+    print(f"{len(identifiers)} identifiers x {len(session.windows)} windows")
+
+    start = time.perf_counter()
+    python_scores = []
+    for identifier in identifiers:
+        clean_title, keywords = session.query(identifier)
+        python_scores.append([session.score(identifier, clean_title, keywords, position)
+                              for position in range(len(session.windows))])
+    python_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    numpy_scores = VectorizedScorer(session).score_matrix(identifiers)
+    numpy_time = time.perf_counter() - start
+
+    if not np.array_equal(numpy_scores, np.array(python_scores)):
+        sys.exit("engines disagree")
+    print(f"{'python':<8} {python_time * 1000:10.2f} ms")
+    print(f"{'numpy':<8} {numpy_time * 1000:10.2f} ms  ({python_time / numpy_time:.1f}x faster, scores identical)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,2762 @@
-import customtkinter as ctk
 from tkinter import messagebox
-import win32gui
-import win32con
-import win32process
-import psutil
+from collections import OrderedDict, namedtuple
+from collections.abc import Mapping, MutableMapping
+import bisect
+import ctypes
+import heapq
+import itertools
 import json
 import os
+import queue
+import random
 import re
+import sqlite3
+import sys
 import threading
+import time
+import types
+
+try:
+    import customtkinter as ctk
+except ImportError:  # Core and simulated backend still work headless
+    ctk = None
+
+try:
+    import win32gui
+    import win32con
+    import win32process
+except ImportError:  # Not on Windows - only the simulated backend is usable
+    win32gui = win32con = win32process = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import numpy as np
+except ImportError:  # Matching falls back to the pure-Python scorer
+    np = None
 
 # Set appearance mode and color theme
-ctk.set_appearance_mode("dark")
-ctk.set_default_color_theme("blue")
+if ctk is not None:
+    ctk.set_appearance_mode("dark")
+    ctk.set_default_color_theme("blue")
+
+
+class WindowBackend:
+    """Interface between the window manager and the desktop it manages"""
+    
+    def enum_windows(self):
+        """Return the handles of all top-level windows"""
+        raise NotImplementedError
+    
+    def is_window_visible(self, hwnd):
+        raise NotImplementedError
+    
+    def get_window_text(self, hwnd):
+        raise NotImplementedError
+    
+    def get_class_name(self, hwnd):
+        raise NotImplementedError
+    
+    def get_window_pid(self, hwnd):
+        raise NotImplementedError
+    
+    def iter_processes(self):
+        """Yield (pid, process_name, create_time) for every running process"""
+        raise NotImplementedError
+    
+    def get_process_exe(self, pid):
+        """Return the executable path of a process, or "" if unavailable"""
+        raise NotImplementedError
+    
+    def get_process_info(self, pid):
+        """Return (process_name, exe_path), or ("Unknown", "") if unavailable"""
+        raise NotImplementedError
+    
+    def get_window_rect(self, hwnd):
+        """Return (left, top, right, bottom)"""
+        raise NotImplementedError
+    
+    def set_window_pos(self, hwnd, x, y, width, height):
+        raise NotImplementedError
+    
+    def set_window_positions(self, moves):
+        """Move (hwnd, x, y, width, height) windows as one batch; returns [(hwnd, error message)] for failures"""
+        failures = []
+        for hwnd, x, y, width, height in moves:
+            try:
+                self.set_window_pos(hwnd, x, y, width, height)
+            except Exception as e:
+                failures.append((hwnd, str(e)))
+        return failures
+    
+    def show_window(self, hwnd, state):
+        """Change the show state of a window ("minimize" or "restore")"""
+        raise NotImplementedError
+    
+    def subscribe_events(self, callback, on_failure=None):
+        """Report window changes as callback(kind, hwnd), possibly from another thread"""
+        # kind is "create", "destroy", "show", "hide", "location" or "name".
+        # Returns False if the backend has no events; if that only turns out
+        # later, on_failure() is called instead.
+        return False
+    
+    def unsubscribe_events(self):
+        """Stop reporting window events"""
+
+
+class Win32Backend(WindowBackend):
+    """Backend for the real Windows desktop via pywin32 and psutil"""
+    
+    # SetWinEventHook events reported by subscribe_events
+    WIN_EVENTS = {
+        0x8000: "create",    # EVENT_OBJECT_CREATE
+        0x8001: "destroy",   # EVENT_OBJECT_DESTROY
+        0x8002: "show",      # EVENT_OBJECT_SHOW
+        0x8003: "hide",      # EVENT_OBJECT_HIDE
+        0x800B: "location",  # EVENT_OBJECT_LOCATIONCHANGE
+        0x800C: "name",      # EVENT_OBJECT_NAMECHANGE
+    }
+    
+    def __init__(self):
+        if win32gui is None or psutil is None:
+            raise RuntimeError("The Win32 backend requires pywin32 and psutil")
+        self._event_thread = None
+        self._event_thread_id = None
+    
+    def enum_windows(self):
+        hwnds = []
+        
+        def enum_windows_callback(hwnd, results):
+            results.append(hwnd)
+            return True
+        
+        win32gui.EnumWindows(enum_windows_callback, hwnds)
+        return hwnds
+    
+    def is_window_visible(self, hwnd):
+        return win32gui.IsWindowVisible(hwnd)
+    
+    def get_window_text(self, hwnd):
+        return win32gui.GetWindowText(hwnd)
+    
+    def get_class_name(self, hwnd):
+        return win32gui.GetClassName(hwnd)
+    
+    def get_window_pid(self, hwnd):
+        _, pid = win32process.GetWindowThreadProcessId(hwnd)
+        return pid
+    
+    def iter_processes(self):
+        for process in psutil.process_iter(['pid', 'name', 'create_time']):
+            info = process.info
+            yield info['pid'], info['name'] or "Unknown", info['create_time']
+    
+    def get_process_exe(self, pid):
+        try:
+            return psutil.Process(pid).exe()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return ""
+    
+    def get_process_info(self, pid):
+        try:
+            process = psutil.Process(pid)
+            return process.name(), process.exe()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return "Unknown", ""
+    
+    def get_window_rect(self, hwnd):
+        return win32gui.GetWindowRect(hwnd)
+    
+    def set_window_pos(self, hwnd, x, y, width, height):
+        win32gui.SetWindowPos(hwnd, win32con.HWND_TOP, x, y, width, height, 0)
+    
+    def set_window_positions(self, moves):
+        failures = []
+        valid = []
+        for move in moves:
+            if win32gui.IsWindow(move[0]):
+                valid.append(move)
+            else:
+                failures.append((move[0], "Window no longer exists"))
+        if not valid:
+            return failures
+        
+        # One DeferWindowPos batch repositions every window in a single update
+        try:
+            hdwp = win32gui.BeginDeferWindowPos(len(valid))
+            for hwnd, x, y, width, height in valid:
+                hdwp = win32gui.DeferWindowPos(hdwp, hwnd, win32con.HWND_TOP, x, y, width, height, 0)
+            win32gui.EndDeferWindowPos(hdwp)
+        except Exception:
+            # Windows abandons the whole batch on any failure, so retry one by one
+            failures.extend(WindowBackend.set_window_positions(self, valid))
+        return failures
+    
+    def show_window(self, hwnd, state):
+        commands = {"minimize": win32con.SW_MINIMIZE, "restore": win32con.SW_RESTORE}
+        win32gui.ShowWindow(hwnd, commands[state])
+    
+    def subscribe_events(self, callback, on_failure=None):
+        if self._event_thread is not None:
+            return False
+        # The hook is installed on the event thread; if that fails there,
+        # on_failure is called from it
+        self._event_thread = threading.Thread(target=self._event_loop, args=(callback, on_failure),
+                                              name="win-events", daemon=True)
+        self._event_thread.start()
+        return True
+    
+    def unsubscribe_events(self):
+        if self._event_thread_id is not None:
+            ctypes.windll.user32.PostThreadMessageW(self._event_thread_id, win32con.WM_QUIT, 0, 0)
+        self._event_thread = None
+        self._event_thread_id = None
+    
+    def _event_loop(self, callback, on_failure):
+        """Own the WinEvent hook; out-of-context hooks need a message loop on their thread"""
+        from ctypes import wintypes
+        user32 = ctypes.windll.user32
+        proc_type = ctypes.WINFUNCTYPE(None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+                                       wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+        try:
+            user32.GetAncestor.argtypes = [wintypes.HWND, wintypes.UINT]
+            user32.GetAncestor.restype = wintypes.HWND
+            user32.SetWinEventHook.argtypes = [wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE, proc_type,
+                                               wintypes.DWORD, wintypes.DWORD, wintypes.DWORD]
+            user32.SetWinEventHook.restype = wintypes.HANDLE
+            user32.UnhookWinEvent.argtypes = [wintypes.HANDLE]
+            user32.UnhookWinEvent.restype = wintypes.BOOL
+            user32.GetMessageW.argtypes = [ctypes.POINTER(wintypes.MSG), wintypes.HWND, wintypes.UINT, wintypes.UINT]
+            user32.GetMessageW.restype = wintypes.BOOL
+            
+            def on_event(hook, event, hwnd, id_object, id_child, thread_id, event_time):
+                kind = self.WIN_EVENTS.get(event)
+                # Whole windows only, not carets, cursors or child controls.
+                # A destroyed window has no ancestor left to check.
+                if kind is None or not hwnd or id_object != 0 or id_child != 0:
+                    return
+                if kind != "destroy" and user32.GetAncestor(hwnd, 2) != hwnd:  # GA_ROOT
+                    return
+                callback(kind, hwnd)
+            
+            proc = proc_type(on_event)
+            hook = user32.SetWinEventHook(min(self.WIN_EVENTS), max(self.WIN_EVENTS), None, proc, 0, 0,
+                                          0x0002)  # WINEVENT_OUTOFCONTEXT | WINEVENT_SKIPOWNPROCESS
+            self._event_thread_id = ctypes.windll.kernel32.GetCurrentThreadId()
+            if not hook:
+                raise ctypes.WinError()
+        except Exception as e:
+            print(f"Failed to hook window events: {e}")
+            self._event_thread = None
+            self._event_thread_id = None
+            if on_failure is not None:
+                on_failure()
+            return
+        
+        msg = wintypes.MSG()
+        while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+            user32.TranslateMessage(ctypes.byref(msg))
+            user32.DispatchMessageW(ctypes.byref(msg))
+        user32.UnhookWinEvent(hook)
+
+
+# Sample applications used to populate synthetic desktops:
+# (process name, exe path, class name, title templates, max windows per process)
+SIMULATED_APPS = [
+    ("chrome.exe", r"C:\Program Files\Google\Chrome\Application\chrome.exe", "Chrome_WidgetWin_1",
+     ["{topic} - Google Chrome", "https://{site}/{topic} - Google Chrome"], 12),
+    ("brave.exe", r"C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe", "Chrome_WidgetWin_1",
+     ["{topic} - Brave", "{site} - {topic} - Brave"], 8),
+    ("firefox.exe", r"C:\Program Files\Mozilla Firefox\firefox.exe", "MozillaWindowClass",
+     ["{topic} \u2014 Mozilla Firefox", "{site} - Mozilla Firefox"], 8),
+    ("Code.exe", r"C:\Users\dev\AppData\Local\Programs\Microsoft VS Code\Code.exe", "Chrome_WidgetWin_1",
+     ["{file} - {project} - Visual Studio Code", "{project} - Visual Studio Code"], 6),
+    ("notepad.exe", r"C:\Windows\System32\notepad.exe", "Notepad",
+     ["{file} - Notepad"], 1),
+    ("notepad++.exe", r"C:\Program Files\Notepad++\notepad++.exe", "Notepad++",
+     ["*{file} - Notepad++"], 1),
+    ("explorer.exe", r"C:\Windows\explorer.exe", "CabinetWClass",
+     ["{project}", "Downloads", "Documents"], 6),
+    ("WindowsTerminal.exe", r"C:\Program Files\WindowsApps\WindowsTerminal.exe", "CASCADIA_HOSTING_WINDOW_CLASS",
+     ["Windows PowerShell", "{project} - Terminal"], 3),
+    ("Discord.exe", r"C:\Users\dev\AppData\Local\Discord\app\Discord.exe", "Chrome_WidgetWin_1",
+     ["#{topic} | {project} - Discord"], 1),
+    ("Spotify.exe", r"C:\Users\dev\AppData\Roaming\Spotify\Spotify.exe", "Chrome_WidgetWin_0",
+     ["Spotify Premium", "{topic} - Spotify"], 1),
+    ("slack.exe", r"C:\Users\dev\AppData\Local\slack\slack.exe", "Chrome_WidgetWin_1",
+     ["{topic} (Channel) - {project} - Slack"], 2),
+    ("EXCEL.EXE", r"C:\Program Files\Microsoft Office\root\Office16\EXCEL.EXE", "XLMAIN",
+     ["{file}.xlsx - Excel"], 4),
+    ("WINWORD.EXE", r"C:\Program Files\Microsoft Office\root\Office16\WINWORD.EXE", "OpusApp",
+     ["{file}.docx - Word"], 4),
+    ("pycharm64.exe", r"C:\Program Files\JetBrains\PyCharm\bin\pycharm64.exe", "SunAwtFrame",
+     ["{project} \u2013 {file}.py"], 2),
+    ("obs64.exe", r"C:\Program Files\obs-studio\bin\64bit\obs64.exe", "Qt5152QWindowIcon",
+     ["OBS 29.1.3 - Profile: {project} - Scenes: {topic}"], 1),
+]
+
+SIMULATED_WORDS = {
+    "topic": ["Inbox", "Pull Request #4821", "Release Notes", "Dashboard", "Quarterly Report", "Weather",
+              "Python docs", "Issue Tracker", "Design Review", "Standup", "Music", "Recipes"],
+    "site": ["github.com", "docs.python.org", "mail.google.com", "news.ycombinator.com",
+             "stackoverflow.com", "youtube.com", "wikipedia.org"],
+    "file": ["main", "README", "notes", "budget", "report", "utils", "config", "todo"],
+    "project": ["window_manager", "website", "backend", "data-pipeline", "thesis", "homelab"],
+}
+
+
+class SimulatedWindow:
+    """A synthetic top-level window held by SimulatedBackend"""
+    
+    def __init__(self, hwnd, title, class_name, pid, rect, visible=True):
+        self.hwnd = hwnd
+        self.title = title
+        self.class_name = class_name
+        self.pid = pid
+        self.rect = rect
+        self.visible = visible
+        self.minimized = False
+
+
+class SimulatedBackend(WindowBackend):
+    """In-memory desktop for headless benchmarking and regression testing"""
+    
+    def __init__(self, latencies=None, screen_size=(1920, 1080)):
+        self.latencies = dict(latencies or {})
+        self.screen_size = screen_size
+        self.call_counts = {}
+        self.windows = {}  # hwnd -> SimulatedWindow, in z-order
+        self.processes = {}  # pid -> (process_name, exe_path, create_time)
+        self._clock = 0
+        self._next_hwnd = 0x10010
+        self._event_callbacks = []
+        self.event_log = []  # (kind, hwnd) of every emitted event
+    
+    @classmethod
+    def synthetic(cls, window_count, seed=0, latencies=None):
+        """Build a desktop with window_count visible windows spread over realistic apps"""
+        backend = cls(latencies=latencies)
+        rng = random.Random(seed)
+        screen_w, screen_h = backend.screen_size
+        next_pid = 1000
+        while len(backend.windows) < window_count:
+            process_name, exe_path, class_name, templates, per_process = rng.choice(SIMULATED_APPS)
+            pid = next_pid
+            next_pid += 4
+            backend.add_process(pid, process_name, exe_path)
+            for _ in range(rng.randint(1, per_process)):
+                if len(backend.windows) >= window_count:
+                    break
+                title = rng.choice(templates).format(
+                    **{key: rng.choice(words) for key, words in SIMULATED_WORDS.items()})
+                width = rng.randint(400, screen_w)
+                height = rng.randint(300, screen_h)
+                x = rng.randint(-8, screen_w - width + 8)
+                y = rng.randint(0, screen_h - height)
+                backend.add_window(title, pid, class_name, (x, y, x + width, y + height))
+        return backend
+    
+    def _emit(self, kind, hwnd):
+        self.event_log.append((kind, hwnd))
+        for callback in self._event_callbacks:
+            callback(kind, hwnd)
+    
+    def subscribe_events(self, callback, on_failure=None):
+        self._event_callbacks.append(callback)
+        return True
+    
+    def unsubscribe_events(self):
+        self._event_callbacks = []
+    
+    def replay(self, events):
+        """Deliver (kind, hwnd) events to subscribers without touching any window"""
+        for kind, hwnd in events:
+            for callback in self._event_callbacks:
+                callback(kind, hwnd)
+    
+    def _call(self, method):
+        self.call_counts[method] = self.call_counts.get(method, 0) + 1
+        latency = self.latencies.get(method)
+        if latency:
+            time.sleep(latency)
+    
+    def add_process(self, pid, process_name, exe_path=""):
+        """Start a process; re-adding a live pid simulates PID reuse"""
+        self._clock += 1
+        self.processes[pid] = (process_name, exe_path, float(self._clock))
+    
+    def remove_process(self, pid):
+        self.processes.pop(pid, None)
+    
+    def add_window(self, title, pid, class_name="", rect=(0, 0, 800, 600), visible=True):
+        """Create a window and return its handle"""
+        hwnd = self._next_hwnd
+        self._next_hwnd += 2
+        self.windows[hwnd] = SimulatedWindow(hwnd, title, class_name, pid, tuple(rect), visible)
+        self._emit("create", hwnd)
+        return hwnd
+    
+    def remove_window(self, hwnd):
+        if self.windows.pop(hwnd, None) is not None:
+            self._emit("destroy", hwnd)
+    
+    def set_window_title(self, hwnd, title):
+        self._window(hwnd).title = title
+        self._emit("name", hwnd)
+    
+    def set_window_visible(self, hwnd, visible):
+        self._window(hwnd).visible = visible
+        self._emit("show" if visible else "hide", hwnd)
+    
+    def _window(self, hwnd):
+        try:
+            return self.windows[hwnd]
+        except KeyError:
+            raise OSError(f"Invalid window handle: {hwnd}")
+    
+    def enum_windows(self):
+        self._call("enum_windows")
+        return list(self.windows)
+    
+    def is_window_visible(self, hwnd):
+        self._call("is_window_visible")
+        window = self.windows.get(hwnd)
+        return window is not None and window.visible
+    
+    def get_window_text(self, hwnd):
+        self._call("get_window_text")
+        return self._window(hwnd).title
+    
+    def get_class_name(self, hwnd):
+        self._call("get_class_name")
+        return self._window(hwnd).class_name
+    
+    def get_window_pid(self, hwnd):
+        self._call("get_window_pid")
+        return self._window(hwnd).pid
+    
+    def iter_processes(self):
+        self._call("iter_processes")
+        for pid, (process_name, _, create_time) in list(self.processes.items()):
+            yield pid, process_name, create_time
+    
+    def get_process_exe(self, pid):
+        self._call("get_process_exe")
+        return self.processes.get(pid, ("", "", None))[1]
+    
+    def get_process_info(self, pid):
+        self._call("get_process_info")
+        return self.processes.get(pid, ("Unknown", "", None))[:2]
+    
+    def get_window_rect(self, hwnd):
+        self._call("get_window_rect")
+        return self._window(hwnd).rect
+    
+    def set_window_pos(self, hwnd, x, y, width, height):
+        self._call("set_window_pos")
+        self._window(hwnd).rect = (x, y, x + width, y + height)
+        self._emit("location", hwnd)
+    
+    def set_window_positions(self, moves):
+        self._call("set_window_positions")
+        failures = []
+        for hwnd, x, y, width, height in moves:
+            window = self.windows.get(hwnd)
+            if window is None:
+                failures.append((hwnd, f"Invalid window handle: {hwnd}"))
+            else:
+                window.rect = (x, y, x + width, y + height)
+                self._emit("location", hwnd)
+        return failures
+    
+    def show_window(self, hwnd, state):
+        self._call("show_window")
+        self._window(hwnd).minimized = state == "minimize"
+        self._emit("location", hwnd)
+
+
+class ProcessTable:
+    """Process names and start times from one scan per refresh, exe paths looked up lazily"""
+    
+    def __init__(self, backend):
+        self.backend = backend
+        self.processes = {}  # pid -> (process_name, create_time)
+        self._exe_cache = {}  # (pid, create_time) -> exe_path
+    
+    def refresh(self):
+        """Rescan running processes"""
+        self.processes = {pid: (name, create_time)
+                          for pid, name, create_time in self.backend.iter_processes()}
+        # Forget exe paths of processes that exited or whose PID was reused
+        self._exe_cache = {key: exe for key, exe in self._exe_cache.items()
+                           if key[0] in self.processes and self.processes[key[0]][1] == key[1]}
+    
+    def lookup(self, pid):
+        """Return (process_name, exe_path) for pid"""
+        entry = self.processes.get(pid)
+        if entry is None:
+            # Process started after the last scan
+            return self.backend.get_process_info(pid)
+        
+        name, create_time = entry
+        key = (pid, create_time)
+        exe_path = self._exe_cache.get(key)
+        if exe_path is None:
+            exe_path = self._exe_cache[key] = self.backend.get_process_exe(pid)
+        return name, exe_path
+
+
+# Default app classification rules, in priority order. app_rules.json
+# overrides these so in-house apps can be added without code changes.
+DEFAULT_APP_RULES = [
+    {'app_type': 'brave', 'keywords': ['brave', 'brave-browser']},
+    {'app_type': 'chrome', 'keywords': ['chrome', 'google chrome']},
+    {'app_type': 'firefox', 'keywords': ['firefox', 'mozilla']},
+    {'app_type': 'code', 'keywords': ['visual studio code', 'code', 'vscode']},
+    {'app_type': 'notepad', 'keywords': ['notepad']},
+    {'app_type': 'notepad++', 'keywords': ['notepad++', 'npp']},
+    {'app_type': 'explorer', 'keywords': ['file explorer', 'windows explorer']},
+    {'app_type': 'cmd', 'keywords': ['command prompt', 'cmd']},
+    {'app_type': 'powershell', 'keywords': ['powershell']},
+    {'app_type': 'terminal', 'keywords': ['terminal', 'windows terminal']},
+    {'app_type': 'discord', 'keywords': ['discord']},
+    {'app_type': 'spotify', 'keywords': ['spotify']},
+    {'app_type': 'steam', 'keywords': ['steam']},
+    {'app_type': 'obs', 'keywords': ['obs studio', 'obs']},
+    {'app_type': 'slack', 'keywords': ['slack']},
+    {'app_type': 'teams', 'keywords': ['microsoft teams', 'teams']},
+    {'app_type': 'excel', 'keywords': ['excel', 'microsoft excel']},
+    {'app_type': 'word', 'keywords': ['word', 'microsoft word']},
+    {'app_type': 'outlook', 'keywords': ['outlook', 'microsoft outlook']},
+    {'app_type': 'pycharm', 'keywords': ['pycharm']},
+    {'app_type': 'intellij', 'keywords': ['intellij', 'idea']},
+    {'app_type': 'sublime', 'keywords': ['sublime text', 'sublime']},
+    {'app_type': 'atom', 'keywords': ['atom']},
+    {'app_type': 'git', 'keywords': ['git', 'github desktop']},
+]
+
+
+class AppClassifier:
+    """App-type rules compiled into one regex scan per string; the first rule in file order wins"""
+    
+    def __init__(self, rules):
+        self.rules = []
+        self.display_names = {}
+        for rule in rules:
+            keywords = [keyword.lower() for keyword in rule['keywords'] if keyword]
+            self.rules.append((rule['app_type'], keywords))
+            if rule.get('display_name'):
+                self.display_names[rule['app_type']] = rule['display_name']
+        
+        rank = {}
+        for index, (_, keywords) in enumerate(self.rules):
+            for keyword in keywords:
+                rank.setdefault(keyword, index)
+        # The alternation is tried longest first, so a match hides the shorter
+        # keywords starting at the same position; they are all prefixes of it
+        self._best_rank = {keyword: min(rank[other] for other in rank if keyword.startswith(other))
+                           for keyword in rank}
+        
+        self._pattern = None
+        if rank:
+            self._pattern = re.compile('|'.join(re.escape(keyword)
+                                                for keyword in sorted(rank, key=len, reverse=True)))
+        self._process_ranks = {}  # process names repeat a lot, so remember their best rank
+    
+    @classmethod
+    def load(cls, path):
+        """Load rules from a JSON rules file, falling back to the built-in rules"""
+        try:
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    return cls(json.load(f)['apps'])
+        except Exception as e:
+            print(f"Failed to load app rules from {path}: {e}")
+        return cls(DEFAULT_APP_RULES)
+    
+    def _best(self, text, best):
+        search = self._pattern.search
+        pos = 0
+        # Restart one character after each match so overlapping keywords are seen
+        while best != 0:
+            match = search(text, pos)
+            if match is None:
+                break
+            rank = self._best_rank[match.group()]
+            if best is None or rank < best:
+                best = rank
+            pos = match.start() + 1
+        return best
+    
+    def classify(self, process_base, title_lower):
+        """Return the app_type for a lowercased process base name and title, or None"""
+        if self._pattern is None:
+            return None
+        if process_base not in self._process_ranks:
+            self._process_ranks[process_base] = self._best(process_base, None)
+        best = self._best(title_lower, self._process_ranks[process_base])
+        return self.rules[best][0] if best is not None else None
+
+
+class IdentifierCache:
+    """Bounded LRU cache for window classification results"""
+    
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Shared by the UI thread and the snapshot worker
+        self.lock = threading.Lock()
+    
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+    
+    def stats(self):
+        return {'size': len(self.entries), 'hits': self.hits, 'misses': self.misses}
+
+
+class CandidateIndex:
+    """Windows of a snapshot indexed by process, app type, class and exe, to pick the ones worth scoring"""
+    
+    def __init__(self, windows, app_types):
+        self.size = len(windows)
+        self.by_process = {}
+        self.by_app_type = {}
+        self.by_class = {}
+        self.by_exe = {}
+        for position, (window_info, app_type) in enumerate(zip(windows, app_types)):
+            self.by_process.setdefault(window_info.process_name, []).append(position)
+            self.by_app_type.setdefault(app_type, []).append(position)
+            self.by_class.setdefault(window_info.class_name, []).append(position)
+            if window_info.exe_path:
+                self.by_exe.setdefault(window_info.exe_path, []).append(position)
+    
+    def candidates(self, identifier):
+        """Return snapshot positions worth scoring for identifier, in snapshot order"""
+        positions = set(self.by_process.get(identifier['process_name'], ()))
+        positions.update(self.by_app_type.get(identifier['app_type'], ()))
+        positions.update(self.by_class.get(identifier['class_name'], ()))
+        if identifier.get('exe_path'):
+            positions.update(self.by_exe.get(identifier['exe_path'], ()))
+        if not positions:
+            return range(self.size)
+        return sorted(positions)
+
+
+class MatchSession:
+    """A window snapshot identified once and shared by every layout entry matched against it"""
+    
+    def __init__(self, windows, identifiers):
+        self.windows = windows
+        self.identifiers = identifiers
+        self.titles = [window_info.title for window_info in windows]
+        self.process_names = [window_info.process_name for window_info in windows]
+        self.app_types = [identifier.app_type for identifier in identifiers]
+        self.clean_titles = [identifier.clean_title.lower() for identifier in identifiers]
+        self.keyword_sets = [set(identifier.title_keywords) for identifier in identifiers]
+        self.index = CandidateIndex(windows, self.app_types)
+        # Flat columns for row_scores, which scores one entry against many windows
+        self.class_names = [identifier.class_name for identifier in identifiers]
+        self.exe_paths = [identifier.exe_path for identifier in identifiers]
+        self.positions = [(identifier.position_x, identifier.position_y) for identifier in identifiers]
+        self.title_lengths = [identifier.title_length for identifier in identifiers]
+        self._vectorized_scorer = None
+    
+    def vectorized_scorer(self):
+        """Return the NumPy scorer for this snapshot, building it on first use"""
+        if self._vectorized_scorer is None:
+            self._vectorized_scorer = VectorizedScorer(self)
+        return self._vectorized_scorer
+    
+    def query(self, identifier):
+        """Return the (lowercased clean title, keyword set) of a layout identifier"""
+        return (identifier.get('clean_title') or '').lower(), set(identifier.get('title_keywords') or ())
+    
+    def score(self, identifier, clean_title, keywords, position):
+        """Score how well the window at position matches a layout identifier"""
+        return (self.primary_score(identifier, position)
+                + self.secondary_score(identifier, position)
+                + self.title_score(clean_title, keywords, position))
+    
+    def primary_score(self, identifier, position):
+        """Score the high-weight equality features"""
+        score = 0
+        
+        # Exact title match (bonus for perfect matches)
+        if identifier['original_title'] == self.titles[position]:
+            score += 100
+        
+        # Process name match (highest priority)
+        if identifier['process_name'] == self.process_names[position]:
+            score += 60
+        
+        # App type match (high priority)
+        if identifier['app_type'] == self.app_types[position]:
+            score += 50
+        
+        return score
+    
+    def secondary_bound(self, identifier):
+        """Upper bound of secondary_score for identifier against any window"""
+        bound = 40
+        if identifier.get('exe_path'):
+            bound += 35
+        if identifier.get('position_x') and identifier.get('position_y'):
+            bound += 15
+        if identifier.get('title_length'):
+            bound += 5
+        return bound
+    
+    def secondary_score(self, identifier, position):
+        """Score class, exe, position and title length"""
+        current_identifier = self.identifiers[position]
+        score = 0
+        
+        # Class name match (high priority)
+        if identifier['class_name'] == current_identifier.class_name:
+            score += 40
+        
+        # Executable path match (high priority for distinguishing instances)
+        if identifier.get('exe_path') and identifier['exe_path'] == current_identifier.exe_path:
+            score += 35
+        
+        # Position similarity (low-medium priority - windows tend to stay in similar areas)
+        if identifier.get('position_x') and identifier.get('position_y'):
+            x_diff = abs(identifier['position_x'] - current_identifier.position_x)
+            y_diff = abs(identifier['position_y'] - current_identifier.position_y)
+            if x_diff < 100 and y_diff < 100:  # Within 100 pixels
+                score += 15
+            elif x_diff < 300 and y_diff < 300:  # Within 300 pixels
+                score += 8
+        
+        # Title length similarity (low priority)
+        if identifier.get('title_length'):
+            length_diff = abs(identifier['title_length'] - current_identifier.title_length)
+            if length_diff < 10:
+                score += 5
+            elif length_diff < 50:
+                score += 2
+        
+        return score
+    
+    def title_score(self, clean_title, keywords, position):
+        """Score clean title and keyword overlap, the expensive features"""
+        score = 0
+        
+        # Clean title matching (medium-high priority)
+        current_clean_title = self.clean_titles[position]
+        if clean_title and current_clean_title:
+            if clean_title == current_clean_title:
+                score += 45
+            elif clean_title in current_clean_title:
+                score += 25
+        
+        # Title keyword matching (medium priority)
+        if keywords:
+            score += len(keywords & self.keyword_sets[position]) * 8
+        
+        return score
+    
+    def title_score_bound(self, clean_title, keywords, position):
+        """Upper bound of title_score without comparing any strings"""
+        bound = 45 if clean_title and self.clean_titles[position] else 0
+        return bound + 8 * min(len(keywords), len(self.keyword_sets[position]))
+    
+    def row_scores(self, identifier, threshold):
+        """Return {position: score} of the candidate windows scoring at least threshold (and above 0)"""
+        # Same features as score(), with the identifier's fields looked up
+        # once per entry instead of once per window
+        title = identifier['original_title']
+        process_name = identifier['process_name']
+        app_type = identifier['app_type']
+        class_name = identifier['class_name']
+        exe_path = identifier.get('exe_path')
+        x, y = identifier.get('position_x'), identifier.get('position_y')
+        title_length = identifier.get('title_length')
+        clean_title, keywords = self.query(identifier)
+        # Without these, no window can reach the threshold
+        needed = max(threshold, 1) - self.secondary_bound(identifier)
+        keyword_count = len(keywords)
+        
+        titles, process_names, app_types = self.titles, self.process_names, self.app_types
+        clean_titles, keyword_sets = self.clean_titles, self.keyword_sets
+        scores = {}
+        for position in self.index.candidates(identifier):
+            score = 0
+            if title == titles[position]:
+                score += 100
+            if process_name == process_names[position]:
+                score += 60
+            if app_type == app_types[position]:
+                score += 50
+            current_clean_title = clean_titles[position]
+            current_keywords = keyword_sets[position]
+            title_bound = ((45 if clean_title and current_clean_title else 0)
+                           + 8 * min(keyword_count, len(current_keywords)))
+            if score + title_bound < needed:
+                continue
+            
+            if class_name == self.class_names[position]:
+                score += 40
+            if exe_path and exe_path == self.exe_paths[position]:
+                score += 35
+            if x and y:
+                current_x, current_y = self.positions[position]
+                x_diff, y_diff = abs(x - current_x), abs(y - current_y)
+                if x_diff < 100 and y_diff < 100:
+                    score += 15
+                elif x_diff < 300 and y_diff < 300:
+                    score += 8
+            if title_length:
+                length_diff = abs(title_length - self.title_lengths[position])
+                if length_diff < 10:
+                    score += 5
+                elif length_diff < 50:
+                    score += 2
+            if clean_title and current_clean_title:
+                if clean_title == current_clean_title:
+                    score += 45
+                elif clean_title in current_clean_title:
+                    score += 25
+            if keywords:
+                score += len(keywords & current_keywords) * 8
+            
+            if score > 0 and score >= threshold:
+                scores[position] = score
+        return scores
+
+
+# Below this many entry x window pairs the pure-Python scorer is faster
+VECTORIZE_MIN_PAIRS = 20000
+
+# A matched entry whose best unclaimed window scores within this many points
+# of its own match could just as well have landed on that window
+AMBIGUITY_MARGIN = 5
+
+
+class VectorizedScorer:
+    """NumPy engine scoring a whole identifiers x windows matrix at once, same scores as MatchSession.score"""
+    
+    def __init__(self, session):
+        if np is None:
+            raise RuntimeError("The vectorized scorer requires numpy")
+        self.session = session
+        self.string_ids = {}
+        windows = session.windows
+        identifiers = session.identifiers
+        self.process = self._encode(w.process_name for w in windows)
+        self.app_type = self._encode(i.app_type for i in identifiers)
+        self.class_name = self._encode(w.class_name for w in windows)
+        self.exe_path = self._encode(i.exe_path for i in identifiers)
+        self.title = self._encode(w.title for w in windows)
+        self.position_x = np.array([i.position_x for i in identifiers], dtype=np.int64)
+        self.position_y = np.array([i.position_y for i in identifiers], dtype=np.int64)
+        self.title_length = np.array([i.title_length for i in identifiers], dtype=np.int64)
+        
+        # Distinct lowercased clean titles, and which one each window has
+        self.clean_titles = list(dict.fromkeys(session.clean_titles))
+        clean_index = {title: k for k, title in enumerate(self.clean_titles)}
+        self.clean_title = np.array([clean_index[t] for t in session.clean_titles], dtype=np.int64)
+        
+        # Window x keyword incidence matrix
+        self.keyword_ids = {}
+        for keywords in session.keyword_sets:
+            for keyword in keywords:
+                self.keyword_ids.setdefault(keyword, len(self.keyword_ids))
+        self.keywords = np.zeros((len(windows), len(self.keyword_ids)), dtype=np.float32)
+        for position, keywords in enumerate(session.keyword_sets):
+            for keyword in keywords:
+                self.keywords[position, self.keyword_ids[keyword]] = 1
+    
+    def _encode(self, values):
+        string_ids = self.string_ids
+        return np.array([string_ids.setdefault(value, len(string_ids)) for value in values], dtype=np.int64)
+    
+    def _lookup(self, values):
+        # Strings never seen on the window side get -1, which matches nothing
+        return np.array([self.string_ids.get(value, -1) for value in values], dtype=np.int64)
+    
+    def score_matrix(self, identifiers):
+        """Return an int64 array of shape (len(identifiers), len(windows))"""
+        rows = len(identifiers)
+        if rows == 0 or len(self.session.windows) == 0:
+            return np.zeros((rows, len(self.session.windows)), dtype=np.int64)
+        
+        def column(values):
+            return values[None, :]
+        
+        def row(values):
+            return values[:, None]
+        
+        process = self._lookup(i['process_name'] for i in identifiers)
+        app_type = self._lookup(i['app_type'] for i in identifiers)
+        class_name = self._lookup(i['class_name'] for i in identifiers)
+        exe_path = self._lookup((i.get('exe_path') or None) for i in identifiers)
+        title = self._lookup(i['original_title'] for i in identifiers)
+        
+        scores = np.where(row(process) == column(self.process), 60, 0)
+        scores += np.where(row(app_type) == column(self.app_type), 50, 0)
+        scores += np.where(row(class_name) == column(self.class_name), 40, 0)
+        scores += np.where((row(exe_path) >= 0) & (row(exe_path) == column(self.exe_path)), 35, 0)
+        
+        # Clean title: 45 if equal, 25 if contained, evaluated per distinct title pair
+        clean_titles = [(i.get('clean_title') or '').lower() for i in identifiers]
+        queries = list(dict.fromkeys(t for t in clean_titles if t))
+        if queries:
+            targets = np.array(self.clean_titles, dtype=str)
+            query_array = np.array(queries, dtype=str)
+            contained = np.char.find(targets[None, :], query_array[:, None]) >= 0
+            clean_score = np.where(targets[None, :] == query_array[:, None], 45, np.where(contained, 25, 0))
+            clean_score[:, targets == ''] = 0
+            query_index = {title: k for k, title in enumerate(queries)}
+            query_rows = np.array([query_index.get(t, 0) for t in clean_titles], dtype=np.int64)
+            has_query = np.array([bool(t) for t in clean_titles])
+            scores += np.where(row(has_query), clean_score[query_rows][:, self.clean_title], 0)
+        
+        # Keyword overlap: number of shared distinct keywords, 8 points each
+        if self.keyword_ids:
+            query_keywords = np.zeros((rows, len(self.keyword_ids)), dtype=np.float32)
+            for r, identifier in enumerate(identifiers):
+                for keyword in set(identifier.get('title_keywords') or ()):
+                    k = self.keyword_ids.get(keyword)
+                    if k is not None:
+                        query_keywords[r, k] = 1
+            scores += np.rint(query_keywords @ self.keywords.T).astype(np.int64) * 8
+        
+        # Position similarity, only for identifiers with non-zero x and y
+        has_position = np.array([bool(i.get('position_x')) and bool(i.get('position_y')) for i in identifiers])
+        position_x = np.array([i.get('position_x') or 0 for i in identifiers], dtype=np.int64)
+        position_y = np.array([i.get('position_y') or 0 for i in identifiers], dtype=np.int64)
+        x_diff = np.abs(row(position_x) - column(self.position_x))
+        y_diff = np.abs(row(position_y) - column(self.position_y))
+        position_score = np.where((x_diff < 100) & (y_diff < 100), 15,
+                                  np.where((x_diff < 300) & (y_diff < 300), 8, 0))
+        scores += np.where(row(has_position), position_score, 0)
+        
+        # Title length similarity, only for identifiers with a non-zero length
+        has_length = np.array([bool(i.get('title_length')) for i in identifiers])
+        title_length = np.array([i.get('title_length') or 0 for i in identifiers], dtype=np.int64)
+        length_diff = np.abs(row(title_length) - column(self.title_length))
+        length_score = np.where(length_diff < 10, 5, np.where(length_diff < 50, 2, 0))
+        scores += np.where(row(has_length), length_score, 0)
+        
+        # Exact title bonus
+        scores += np.where((row(title) >= 0) & (row(title) == column(self.title)), 100, 0)
+        return scores
+
+
+def _hungarian(cost):
+    """Minimum-cost {row: column} assignment covering every row of a dense n x m matrix (n <= m)"""
+    n, m = len(cost), len(cost[0])
+    inf = float('inf')
+    # Warm start: row minima as duals, rows take a free tight column greedily
+    u = [0] + [min(row) for row in cost]
+    v = [0] * (m + 1)
+    p = [0] * (m + 1)  # p[j] = row (1-based) assigned to column j
+    way = [0] * (m + 1)
+    unassigned = []
+    for i in range(1, n + 1):
+        row = cost[i - 1]
+        j = next((j for j in range(1, m + 1) if not p[j] and row[j - 1] == u[i]), 0)
+        if j:
+            p[j] = i
+        else:
+            unassigned.append(i)
+    for i in unassigned:
+        p[0] = i
+        j0 = 0
+        minv = [inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            row = cost[i0 - 1]
+            ui0 = u[i0]
+            delta = inf
+            j1 = 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = row[j - 1] - ui0 - v[j]
+                    if cur < minv[j]:
+                        minv[j] = cur
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    return {p[j] - 1: j - 1 for j in range(1, m + 1) if p[j]}
+
+
+def _hungarian_numpy(cost):
+    """_hungarian with the per-column work done on NumPy arrays; same result"""
+    cost = np.asarray(cost, dtype=np.float64)
+    n, m = cost.shape
+    # Warm start: row minima as duals, rows take a free tight column greedily
+    u = np.zeros(n + 1)
+    u[1:] = cost.min(axis=1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=np.int64)
+    way = np.zeros(m + 1, dtype=np.int64)
+    unassigned = []
+    for i in range(1, n + 1):
+        tight = np.flatnonzero((cost[i - 1] == u[i]) & (p[1:] == 0))
+        if len(tight):
+            p[tight[0] + 1] = i
+        else:
+            unassigned.append(i)
+    for i in unassigned:
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            cur = cost[i0 - 1] - u[i0] - v[1:]
+            free = ~used[1:]
+            better = free & (cur < minv[1:])
+            minv[1:][better] = cur[better]
+            way[1:][better] = j0
+            j1 = int(np.argmin(np.where(free, minv[1:], np.inf))) + 1
+            delta = minv[j1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[~used] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    return {int(p[j]) - 1: j - 1 for j in range(1, m + 1) if p[j]}
+
+
+def max_weight_assignment(scores):
+    """One-to-one {row: column} assignment maximising the total of scores {(row, column): score}"""
+    row_scores = {}
+    for (row, column), score in scores.items():
+        row_scores.setdefault(row, {})[column] = score
+    return max_weight_assignment_rows(row_scores)
+
+
+def max_weight_assignment_rows(row_scores):
+    """max_weight_assignment for scores given as {row: {column: score}}"""
+    column_rows = {}
+    for row, edges in row_scores.items():
+        for column in edges:
+            column_rows.setdefault(column, []).append(row)
+    
+    assignment = {}
+    seen_rows = set()
+    seen_columns = set()
+    for start in row_scores:
+        if start in seen_rows:
+            continue
+        
+        # Collect the connected component containing this row
+        seen_rows.add(start)
+        rows = [start]
+        columns = []
+        for row in rows:
+            for column in row_scores[row]:
+                if column not in seen_columns:
+                    seen_columns.add(column)
+                    columns.append(column)
+                    for other in column_rows[column]:
+                        if other not in seen_rows:
+                            seen_rows.add(other)
+                            rows.append(other)
+        
+        # Every row taking its own best column is optimal if none collide
+        best = {row: max(row_scores[row].items(), key=lambda edge: (edge[1], -edge[0]))[0] for row in rows}
+        if len(set(best.values())) == len(best):
+            assignment.update(best)
+            continue
+        
+        row_index = {row: i for i, row in enumerate(rows)}
+        column_index = {column: j for j, column in enumerate(columns)}
+        # Pairs without a score cost 0, i.e. the row is left unassigned
+        cost = [[0] * len(columns) for _ in rows]
+        for row in rows:
+            cost_row = cost[row_index[row]]
+            for column, score in row_scores[row].items():
+                cost_row[column_index[column]] = -score
+        hungarian = _hungarian if np is None else _hungarian_numpy
+        if len(rows) > len(columns):
+            transposed = [list(column) for column in zip(*cost)]
+            pairs = [(i, j) for j, i in hungarian(transposed).items()]
+        else:
+            pairs = hungarian(cost).items()
+        for i, j in pairs:
+            if cost[i][j] < 0:
+                assignment[rows[i]] = columns[j]
+    return assignment
+
+
+def max_weight_assignment_matrix(scores):
+    """max_weight_assignment for a NumPy rows x columns matrix, 0 where a pair is not allowed"""
+    rows = np.flatnonzero(scores.any(axis=1))
+    columns = np.flatnonzero(scores.any(axis=0))
+    if not len(rows):
+        return {}
+    allowed = scores[np.ix_(rows, columns)]
+    if len(rows) > len(columns):
+        pairs = [(i, j) for j, i in _hungarian_numpy(-allowed.T).items()]
+    else:
+        pairs = _hungarian_numpy(-allowed).items()
+    return {int(rows[i]): int(columns[j]) for i, j in pairs if allowed[i, j] > 0}
+
+
+class MoveTransaction:
+    """Window moves collected and applied together in one backend batch"""
+    
+    def __init__(self, backend, tolerance=0):
+        self.backend = backend
+        self.tolerance = tolerance
+        self.moves = {}  # hwnd -> (x, y, width, height)
+        self.skipped = []
+        self.failures = []
+    
+    def move(self, hwnd, x, y, width, height, current_rect=None):
+        """Queue a move; current_rect (left, top, right, bottom) enables the no-op check"""
+        if current_rect is not None:
+            left, top, right, bottom = current_rect
+            tolerance = self.tolerance
+            if (abs(left - x) <= tolerance and abs(top - y) <= tolerance
+                    and abs(right - left - width) <= tolerance and abs(bottom - top - height) <= tolerance):
+                self.moves.pop(hwnd, None)
+                self.skipped.append(hwnd)
+                return False
+        self.moves[hwnd] = (x, y, width, height)
+        return True
+    
+    def __len__(self):
+        return len(self.moves)
+    
+    def commit(self):
+        """Apply every collected move; returns the list of (hwnd, error) failures"""
+        if self.moves:
+            try:
+                self.failures = self.backend.set_window_positions(
+                    [(hwnd,) + rect for hwnd, rect in self.moves.items()])
+            except Exception as e:
+                self.failures = [(hwnd, str(e)) for hwnd in self.moves]
+        return self.failures
+
+
+class WindowSearchIndex:
+    """Lowercase substring index over a window snapshot for the search box"""
+    
+    def __init__(self, windows, app_types, previous=None):
+        known = {id(window_info): text for window_info, text in previous.entries} if previous else {}
+        self.entries = []
+        for window_info, app_type in zip(windows, app_types):
+            text = known.get(id(window_info))
+            if text is None:
+                # Fields joined with a separator a typed query cannot contain
+                text = f"{window_info.title}\0{window_info.process_name}\0{app_type}".lower()
+            self.entries.append((window_info, text))
+        self.last_query = ""
+        self.last_entries = self.entries
+    
+    def filter(self, query):
+        """Return the windows matching query, in snapshot order"""
+        query = query.lower()
+        if query.startswith(self.last_query):
+            entries = self.last_entries
+        else:
+            entries = self.entries
+        if query:
+            entries = [entry for entry in entries if query in entry[1]]
+        else:
+            entries = self.entries
+        self.last_query = query
+        self.last_entries = entries
+        return [window_info for window_info, _ in entries]
+
+
+class _SlotRecord(Mapping):
+    """Base for compact __slots__ records that still read like the old dicts"""
+    
+    __slots__ = ()
+    _fields = ()
+    
+    def __getitem__(self, key):
+        if key in self._field_set:
+            return getattr(self, key)
+        raise KeyError(key)
+    
+    def __iter__(self):
+        return iter(self._fields)
+    
+    def __len__(self):
+        return len(self._fields)
+    
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+    
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self._fields}
+
+
+class WindowRecord(_SlotRecord):
+    """One top-level window: handle, title, class, process and rect"""
+    
+    __slots__ = ('hwnd', 'title', 'class_name', 'process_name', 'exe_path', 'pid', 'rect')
+    _fields = ('hwnd', 'title', 'class_name', 'process_name', 'exe_path', 'pid', 'rect', 'width', 'height')
+    _field_set = frozenset(_fields)
+    
+    def __init__(self, hwnd, title, class_name, process_name, exe_path, pid, rect):
+        self.hwnd = hwnd
+        self.title = title
+        # Shared by every window of the same app, so keep one copy
+        self.class_name = sys.intern(class_name)
+        self.process_name = sys.intern(process_name)
+        self.exe_path = sys.intern(exe_path)
+        self.pid = pid
+        self.rect = tuple(rect)
+    
+    @property
+    def width(self):
+        return self.rect[2] - self.rect[0]
+    
+    @property
+    def height(self):
+        return self.rect[3] - self.rect[1]
+    
+    def moved(self, rect):
+        """Copy of this record at a new rect"""
+        return WindowRecord(self.hwnd, self.title, self.class_name, self.process_name,
+                            self.exe_path, self.pid, rect)
+
+
+class SmartIdentifier(_SlotRecord):
+    """What a layout remembers about a window to find it again, saved through to_dict()"""
+    
+    __slots__ = ('app_type', 'process_name', 'class_name', 'title_keywords', 'clean_title', 'title_length',
+                 'original_title', 'process_pid', 'exe_path', 'position_x', 'position_y')
+    _fields = __slots__
+    _field_set = frozenset(_fields)
+    
+    def __init__(self, app_type, process_name, class_name, title_keywords, clean_title, title_length,
+                 original_title, process_pid, exe_path, position_x, position_y):
+        self.app_type = sys.intern(app_type)
+        self.process_name = sys.intern(process_name)
+        self.class_name = sys.intern(class_name)
+        self.title_keywords = tuple(title_keywords)
+        self.clean_title = clean_title
+        self.title_length = title_length
+        self.original_title = original_title
+        self.process_pid = process_pid
+        self.exe_path = sys.intern(exe_path)
+        self.position_x = position_x
+        self.position_y = position_y
+    
+    def to_dict(self):
+        identifier = super().to_dict()
+        identifier['title_keywords'] = list(self.title_keywords)
+        return identifier
+
+
+class WindowTable:
+    """Persistent hwnd -> WindowRecord table refreshed incrementally"""
+    
+    def __init__(self, core):
+        self.core = core
+        self.records = {}  # hwnd -> window_info from the last refresh
+    
+    def refresh(self):
+        """Return the visible windows in z-order, reusing unchanged records"""
+        seen = []
+        for hwnd in self.core.backend.enum_windows():
+            state = self._read(hwnd)
+            if state is not None:
+                seen.append(state)
+        return self._build(seen)
+    
+    def update(self, hwnds):
+        """Re-read only the given hwnds; new ones go on top, since events carry no z-order"""
+        states = {hwnd: self._read(hwnd) for hwnd in set(hwnds)}
+        seen = [states[hwnd] for hwnd in sorted(states, reverse=True)
+                if hwnd not in self.records and states[hwnd] is not None]
+        for hwnd, window_info in self.records.items():
+            if hwnd not in states:
+                seen.append((hwnd, window_info.title, window_info.pid, window_info.rect))
+            elif states[hwnd] is not None:
+                seen.append(states[hwnd])
+        return self._build(seen)
+    
+    def _read(self, hwnd):
+        """Cheap (hwnd, title, pid, rect) of a listable window, or None"""
+        backend = self.core.backend
+        if not backend.is_window_visible(hwnd):
+            return None
+        try:
+            title = backend.get_window_text(hwnd)
+            pid = backend.get_window_pid(hwnd)
+            rect = backend.get_window_rect(hwnd)
+        except Exception:
+            return None  # Window went away mid-scan
+        if not title or title == "Program Manager":
+            return None
+        return hwnd, title, pid, rect
+    
+    def _build(self, states):
+        """Turn (hwnd, title, pid, rect) states into window infos, reusing records"""
+        seen = []
+        needs_lookup = False
+        for hwnd, title, pid, rect in states:
+            previous = self.records.get(hwnd)
+            if previous is None or previous.title != title or previous.pid != pid:
+                previous = None
+                needs_lookup = True
+            seen.append((hwnd, title, pid, rect, previous))
+        
+        # One process scan covers every new or changed window
+        if needs_lookup:
+            self.core.process_table.refresh()
+        
+        windows = []
+        for hwnd, title, pid, rect, previous in seen:
+            if previous is None:
+                window_info = self.core.build_window_info(hwnd, title, pid, rect)
+                if window_info is None:
+                    continue
+            elif previous.rect != tuple(rect):
+                window_info = previous.moved(rect)
+            else:
+                window_info = previous
+            windows.append(window_info)
+        
+        self.records = {window_info.hwnd: window_info for window_info in windows}
+        return windows
+    
+    @staticmethod
+    def diff(old_windows, new_windows):
+        """WindowDiff of hwnds added, removed and changed between two refreshes"""
+        old = {window_info.hwnd: window_info for window_info in old_windows}
+        added = []
+        changed = []
+        for window_info in new_windows:
+            previous = old.pop(window_info.hwnd, None)
+            if previous is None:
+                added.append(window_info.hwnd)
+            elif previous is not window_info:
+                changed.append(window_info.hwnd)
+        return WindowDiff(tuple(added), tuple(old), tuple(changed))
+
+
+# Hwnds that appeared, went away or changed title/PID/rect since the last snapshot
+WindowDiff = namedtuple('WindowDiff', ['added', 'removed', 'changed'])
+
+# One completed enumeration pass. windows and app_types are parallel tuples;
+# their WindowRecords must not be modified once published.
+WindowSnapshot = namedtuple('WindowSnapshot', ['generation', 'windows', 'app_types', 'fingerprint', 'diff'])
+
+# Result of match_layout. matched holds (window_data, window_info, score),
+# unmatched and ambiguous hold window_data, all in layout order.
+LayoutMatch = namedtuple('LayoutMatch', ['matched', 'unmatched', 'ambiguous'])
+
+
+class WindowRegistry:
+    """hwnd-keyed view of the current snapshot with an app_type index, updated from snapshot diffs"""
+    
+    def __init__(self, core):
+        self.core = core
+        self.generation = 0
+        self.records = {}  # hwnd -> WindowRecord
+        self.identifiers = {}  # hwnd -> SmartIdentifier
+        self.by_app_type = {}  # app_type -> {hwnd: None}, used as an ordered set
+    
+    def update(self, snapshot):
+        """Bring the registry in line with snapshot"""
+        if snapshot.generation == self.generation:
+            return
+        if self.generation and snapshot.generation == self.generation + 1:
+            diff = snapshot.diff
+            for hwnd in diff.removed:
+                self._remove(hwnd)
+            touched = set(diff.added + diff.changed)
+            for window_info in snapshot.windows:
+                if window_info.hwnd in touched:
+                    self._put(window_info)
+        else:
+            self.records = {}
+            self.identifiers = {}
+            self.by_app_type = {}
+            for window_info in snapshot.windows:
+                self._put(window_info)
+        self.generation = snapshot.generation
+    
+    def _put(self, window_info):
+        hwnd = window_info.hwnd
+        identifier = self.core.create_smart_identifier(window_info)
+        previous = self.identifiers.get(hwnd)
+        if previous is not None and previous.app_type != identifier.app_type:
+            self._remove(hwnd)
+        self.records[hwnd] = window_info
+        self.identifiers[hwnd] = identifier
+        self.by_app_type.setdefault(identifier.app_type, {})[hwnd] = None
+    
+    def _remove(self, hwnd):
+        self.records.pop(hwnd, None)
+        identifier = self.identifiers.pop(hwnd, None)
+        if identifier is None:
+            return
+        hwnds = self.by_app_type.get(identifier.app_type)
+        if hwnds is not None:
+            hwnds.pop(hwnd, None)
+            if not hwnds:
+                del self.by_app_type[identifier.app_type]
+    
+    def get(self, hwnd):
+        """Record for hwnd, or None"""
+        return self.records.get(hwnd)
+    
+    def __contains__(self, hwnd):
+        return hwnd in self.records
+    
+    def identifier(self, window_info):
+        """Smart identifier of a window, reused while its record is current"""
+        if self.records.get(window_info.hwnd) is window_info:
+            return self.identifiers[window_info.hwnd]
+        return self.core.create_smart_identifier(window_info)
+    
+    def hwnds_for_app(self, app_type):
+        return list(self.by_app_type.get(app_type, ()))
+
+
+class MatchCache:
+    """Layout match results keyed by (layout name, layout revision, snapshot generation, threshold)"""
+    
+    def __init__(self):
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+    
+    def put(self, key, value):
+        self.entries[key] = value
+    
+    def invalidate_layout(self, layout_name):
+        for key in [key for key in self.entries if key[0] == layout_name]:
+            del self.entries[key]
+    
+    def invalidate_snapshots(self, current_generation):
+        for key in [key for key in self.entries if key[2] != current_generation]:
+            del self.entries[key]
+    
+    def clear(self):
+        self.entries.clear()
+    
+    def stats(self):
+        return {'size': len(self.entries), 'hits': self.hits, 'misses': self.misses}
+
+
+class WindowManagerCore:
+    """Window enumeration, smart identification and matching, independent of the UI"""
+    
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else Win32Backend()
+        self.process_table = ProcessTable(self.backend)
+        self.identifier_cache = IdentifierCache()
+        # Enumeration may run on the snapshot worker and the UI thread
+        self.enumeration_lock = threading.Lock()
+        self.window_table = WindowTable(self)
+        self.snapshot_generations = itertools.count(1)
+        self.last_snapshot = WindowSnapshot(0, (), (), 0, WindowDiff((), (), ()))
+        self.match_cache = MatchCache()
+        self.registry = WindowRegistry(self)
+        self._session_snapshot = None
+        self._session = None
+        self.rules_file = "app_rules.json"
+        self.app_classifier = AppClassifier.load(self.rules_file)
+        
+        # Windows within this many pixels of their target are not moved
+        self.move_tolerance = 2
+        # layout name -> (threshold, desktop fingerprint right after it was applied)
+        self.applied_layouts = {}
+    
+    def report_error(self, title, message):
+        """Surface an error to the user"""
+        print(f"{title}: {message}")
+    
+    def get_window_info(self, hwnd):
+        """Get comprehensive window information for smart matching"""
+        try:
+            return self.build_window_info(hwnd, self.backend.get_window_text(hwnd),
+                                          self.backend.get_window_pid(hwnd),
+                                          self.backend.get_window_rect(hwnd))
+        except Exception:
+            return None
+    
+    def build_window_info(self, hwnd, title, pid, rect):
+        """Build the WindowRecord from the cheaply read title, PID and rect"""
+        try:
+            class_name = self.backend.get_class_name(hwnd)
+            
+            # Process info
+            process_name, exe_path = self.process_table.lookup(pid)
+            
+            return WindowRecord(hwnd, title, class_name, process_name, exe_path, pid, rect)
+        except Exception:
+            return None
+    
+    def create_smart_identifier(self, window_info):
+        """Create a smart identifier for a window with better multi-instance support"""
+        title = window_info.title
+        exe_path = window_info.exe_path
+        
+        # Classification only depends on these, so identify each distinct state once
+        key = (title, window_info.process_name, window_info.class_name, exe_path)
+        classified = self.identifier_cache.get(key)
+        if classified is None:
+            classified = self.classify_window(title, window_info.process_name)
+            self.identifier_cache.put(key, classified)
+        app_type, clean_title, title_keywords = classified
+        
+        # Position info helps distinguish windows
+        return SmartIdentifier(app_type, window_info.process_name, window_info.class_name, title_keywords,
+                               clean_title, len(title), title, window_info.pid, exe_path,
+                               window_info.rect[0], window_info.rect[1])
+    
+    def classify_window(self, title, process_name):
+        """Return (app_type, clean_title, title_keywords) for a window title and process"""
+        # Extract core application name from process
+        process_base = process_name.lower().replace('.exe', '')
+        
+        # Find app type with process name priority
+        app_type = self.app_classifier.classify(process_base, title.lower()) or process_base
+        
+        # Extract meaningful parts of title for better matching
+        # Remove common prefixes/suffixes that change frequently
+        clean_title = title
+        # Remove common browser suffixes
+        clean_title = re.sub(r' - (Google Chrome|Mozilla Firefox|Brave|Microsoft Edge)$', '', clean_title)
+        # Remove VSCode workspace indicators
+        clean_title = re.sub(r' - Visual Studio Code$', '', clean_title)
+        # Extract file/folder names for editors
+        if app_type in ['code', 'sublime', 'atom', 'notepad++']:
+            # Try to extract the main file/folder being edited
+            title_parts = clean_title.split(' - ')
+            if len(title_parts) > 1:
+                clean_title = title_parts[0]  # Usually the file/project name
+        
+        # For browsers, try to extract domain or main content
+        if app_type in ['brave', 'chrome', 'firefox']:
+            # Look for domain patterns or meaningful content identifiers
+            url_match = re.search(r'https?://([^/\s]+)', clean_title)
+            if url_match:
+                clean_title = url_match.group(1)
+            else:
+                # Take first few words of title
+                words = clean_title.split()
+                clean_title = ' '.join(words[:3]) if len(words) > 3 else clean_title
+        
+        title_keywords = tuple(re.findall(r'\b\w+\b', clean_title.lower())[:5])
+        return app_type, clean_title, title_keywords
+    
+    def create_match_session(self, current_windows):
+        """Identify a window snapshot once for all layout entries matched against it"""
+        return MatchSession(current_windows, [self.create_smart_identifier(w) for w in current_windows])
+    
+    def create_search_index(self, windows):
+        """Build the search box index for a window snapshot"""
+        return WindowSearchIndex(windows, [self.create_smart_identifier(w)['app_type'] for w in windows])
+    
+    def match_window_smart(self, identifier, session):
+        """Enhanced smart matching algorithm for better multi-instance support"""
+        matches = self.match_window_top_k(identifier, session, k=1)
+        if matches:
+            return matches[0]
+        
+        return None, 0
+    
+    def match_window_top_k(self, identifier, session, k=1):
+        """Return the k best (window_info, score) matches, best first, ties to the window enumerated first"""
+        if not isinstance(session, MatchSession):
+            session = self.create_match_session(session)
+        
+        clean_title, keywords = session.query(identifier)
+        secondary_bound = session.secondary_bound(identifier)
+        candidates = []
+        for position in session.index.candidates(identifier):
+            primary = session.primary_score(identifier, position)
+            bound = primary + secondary_bound + session.title_score_bound(clean_title, keywords, position)
+            candidates.append((bound, primary, position))
+        
+        # Most promising first, so the k-th best rises quickly
+        candidates.sort(key=lambda candidate: (-candidate[0], candidate[2]))
+        
+        top = []  # min-heap of (score, -position)
+        for bound, primary, position in candidates:
+            if len(top) == k and (bound, -position) < top[0]:
+                if bound < top[0][0]:
+                    break  # Every remaining bound is lower still
+                continue
+            score = (primary + session.secondary_score(identifier, position)
+                     + session.title_score(clean_title, keywords, position))
+            if score <= 0:
+                continue
+            if len(top) < k:
+                heapq.heappush(top, (score, -position))
+            elif (score, -position) > top[0]:
+                heapq.heapreplace(top, (score, -position))
+        
+        return [(session.windows[-negative_position], score)
+                for score, negative_position in sorted(top, reverse=True)]
+    
+    def match_layout(self, layout_data, session, threshold):
+        """Match every entry of a layout to a distinct window by highest total score; returns a LayoutMatch"""
+        entries = [window_data for window_data in layout_data.values() if 'identifier' in window_data]
+        if np is not None and len(entries) * len(session.windows) >= VECTORIZE_MIN_PAIRS:
+            matrix = session.vectorized_scorer().score_matrix([d['identifier'] for d in entries])
+            allowed = np.zeros_like(matrix)
+            for row, window_data in enumerate(entries):
+                positions = np.asarray(session.index.candidates(window_data['identifier']), dtype=np.int64)
+                candidate_scores = matrix[row, positions]
+                keep = candidate_scores >= max(threshold, 1)
+                allowed[row, positions[keep]] = candidate_scores[keep]
+            assignment = max_weight_assignment_matrix(allowed)
+            scores = {(row, position): int(allowed[row, position]) for row, position in assignment.items()}
+            # Best score each entry has on a window no entry was assigned
+            runner_up = {}
+            if assignment:
+                free = np.ones(allowed.shape[1], dtype=bool)
+                free[list(assignment.values())] = False
+                if free.any():
+                    rows = list(assignment)
+                    runner_up = dict(zip(rows, allowed[rows][:, free].max(axis=1).tolist()))
+        else:
+            row_scores = {}
+            for row, window_data in enumerate(entries):
+                candidate_scores = session.row_scores(window_data['identifier'], threshold)
+                if candidate_scores:
+                    row_scores[row] = candidate_scores
+            assignment = max_weight_assignment_rows(row_scores)
+            scores = {(row, position): row_scores[row][position] for row, position in assignment.items()}
+            taken = set(assignment.values())
+            runner_up = {row: max((score for position, score in row_scores[row].items() if position not in taken),
+                                  default=0)
+                         for row in assignment}
+        matched = []
+        unmatched = []
+        ambiguous = []
+        for row, window_data in enumerate(entries):
+            if row in assignment:
+                position = assignment[row]
+                score = scores[row, position]
+                matched.append((window_data, session.windows[position], score))
+                # Windows the assignment handed to other entries don't count,
+                # so twins that each got their own window are not flagged
+                second = runner_up.get(row, 0)
+                if second >= threshold and score - second <= AMBIGUITY_MARGIN:
+                    ambiguous.append(window_data)
+            else:
+                unmatched.append(window_data)
+        return LayoutMatch(matched, unmatched, ambiguous)
+    
+    def get_windows(self):
+        """Get all visible windows with comprehensive info"""
+        with self.enumeration_lock:
+            return self.window_table.refresh()
+    
+    def update_windows(self, hwnds):
+        """Like get_windows, but only re-read the given hwnds"""
+        with self.enumeration_lock:
+            return self.window_table.update(hwnds)
+    
+    def capture_snapshot(self, hwnds=None):
+        """Enumerate visible windows (or re-read just hwnds) into a WindowSnapshot, reusing what did not change"""
+        previous = self.last_snapshot
+        windows = tuple(self.get_windows() if hwnds is None else self.update_windows(hwnds))
+        diff = WindowTable.diff(previous.windows, windows)
+        if not any(diff) and all(a is b for a, b in zip(windows, previous.windows)):
+            return previous
+        
+        known_types = {id(w): app_type for w, app_type in zip(previous.windows, previous.app_types)}
+        app_types = tuple(known_types[id(w)] if id(w) in known_types else self.create_smart_identifier(w)['app_type']
+                          for w in windows)
+        
+        # Update the XOR fingerprint with just the windows that differ
+        fingerprint = previous.fingerprint
+        old_records = {w.hwnd: w for w in previous.windows} if diff.removed or diff.changed else {}
+        new_records = {w.hwnd: w for w in windows} if diff.added or diff.changed else {}
+        for hwnd in diff.removed + diff.changed:
+            w = old_records[hwnd]
+            fingerprint ^= self.window_fingerprint(hwnd, w.title, w.rect)
+        for hwnd in diff.added + diff.changed:
+            w = new_records[hwnd]
+            fingerprint ^= self.window_fingerprint(hwnd, w.title, w.rect)
+        
+        self.last_snapshot = WindowSnapshot(next(self.snapshot_generations), windows, app_types,
+                                            fingerprint, diff)
+        return self.last_snapshot
+    
+    def snapshot_session(self, snapshot):
+        """Match session over a snapshot, built once per snapshot"""
+        if self._session_snapshot is not snapshot:
+            self.registry.update(snapshot)
+            self._session = MatchSession(snapshot.windows,
+                                         [self.registry.identifiers[w.hwnd] for w in snapshot.windows])
+            self._session_snapshot = snapshot
+        return self._session
+    
+    def match_saved_layout(self, layout_name, revision, layout_data, snapshot, threshold):
+        """match_layout against a snapshot through the match cache; layout_data may be a loader for misses"""
+        key = (layout_name, revision, snapshot.generation, threshold)
+        result = self.match_cache.get(key)
+        if result is None:
+            if callable(layout_data):
+                layout_data = layout_data()
+            result = self.match_layout(layout_data, self.snapshot_session(snapshot), threshold)
+            self.match_cache.put(key, result)
+        return result
+    
+    def move_window(self, hwnd, x, y, width, height):
+        """Move and resize a window"""
+        try:
+            self.backend.set_window_pos(hwnd, x, y, width, height)
+        except Exception as e:
+            self.report_error("Error", f"Failed to move window: {str(e)}")
+    
+    def begin_moves(self):
+        """Start collecting window moves to apply as one batch"""
+        return MoveTransaction(self.backend, self.move_tolerance)
+    
+    @staticmethod
+    def window_fingerprint(hwnd, title, rect):
+        return hash((hwnd, title, tuple(rect)))
+    
+    def desktop_fingerprint(self, windows):
+        """Order-independent XOR of every window's (handle, title, rect) hash"""
+        fingerprint = 0
+        for window_info in windows:
+            fingerprint ^= self.window_fingerprint(window_info.hwnd, window_info.title, window_info.rect)
+        return fingerprint
+    
+    def commit_moves(self, transaction):
+        """Apply a MoveTransaction and report all of its failures at once"""
+        failures = transaction.commit()
+        if failures:
+            details = "\n".join(error for _, error in failures[:3])
+            if len(failures) > 3:
+                details += f"\n... and {len(failures) - 3} more"
+            self.report_error("Error", f"Failed to move {len(failures)} of {len(transaction)} windows:\n{details}")
+        return failures
+
+
+class LayoutPool:
+    """Deduplicated strings and identifiers shared by a layout library, and its file format"""
+    
+    FORMAT = 2
+    IDENTIFIER_FIELDS = SmartIdentifier._fields
+    STRING_FIELDS = frozenset(('app_type', 'process_name', 'class_name', 'clean_title',
+                               'original_title', 'exe_path'))
+    POSITION_FIELDS = ('x', 'y', 'width', 'height')
+    
+    def __init__(self):
+        self.strings = {}
+        self.identifiers = {}
+        self.positions = {}
+    
+    def string(self, text):
+        return self.strings.setdefault(text, text)
+    
+    def identifier(self, identifier):
+        """The pooled dict equal to identifier, or identifier itself if it has other fields"""
+        if identifier.keys() != SmartIdentifier._field_set:
+            return identifier
+        values = []
+        for field in self.IDENTIFIER_FIELDS:
+            value = identifier[field]
+            if isinstance(value, str):
+                value = self.string(value)
+            elif field == 'title_keywords' and isinstance(value, list):
+                value = tuple(self.string(keyword) if isinstance(keyword, str) else keyword
+                              for keyword in value)
+            values.append(value)
+        key = tuple(values)
+        try:
+            shared = self.identifiers.get(key)
+        except TypeError:  # An unhashable value; leave this one unshared
+            return identifier
+        if shared is None:
+            shared = dict(zip(self.IDENTIFIER_FIELDS, values))
+            if isinstance(shared['title_keywords'], tuple):
+                shared['title_keywords'] = list(shared['title_keywords'])
+            self.identifiers[key] = shared
+        return shared
+    
+    def position(self, position):
+        """The pooled dict equal to a {x, y, width, height} position"""
+        if position.keys() != set(self.POSITION_FIELDS):
+            return position
+        try:
+            return self.positions.setdefault(tuple(position[field] for field in self.POSITION_FIELDS),
+                                             position)
+        except TypeError:
+            return position
+    
+    def intern_layout(self, layout):
+        """A copy of layout whose entries use the pooled identifiers and positions"""
+        return {key: self.intern_entry(entry) for key, entry in layout.items()}
+    
+    def intern_entry(self, entry):
+        if isinstance(entry, dict) and isinstance(entry.get('identifier'), dict):
+            entry = dict(entry, identifier=self.identifier(entry['identifier']))
+            if isinstance(entry.get('position'), dict):
+                entry['position'] = self.position(entry['position'])
+        return entry
+    
+    def decode(self, data):
+        """Layouts from a parsed layouts file of either format"""
+        if not isinstance(data.get('format'), int):
+            # A plain {name: layout} file; a layout is never an int
+            return {name: self.intern_layout(layout) for name, layout in data.items()}
+        if data['format'] != self.FORMAT:
+            raise ValueError(f"unsupported layouts format {data['format']}")
+        strings = [self.string(text) for text in data['strings']]
+        identifiers = []
+        for row in data['identifiers']:
+            if isinstance(row, list):
+                row = {field: self._decode_value(field, value, strings)
+                       for field, value in zip(self.IDENTIFIER_FIELDS, row)}
+            identifiers.append(self.identifier(row))
+        layouts = {}
+        for name, layout in data['layouts'].items():
+            layouts[name] = decoded = {}
+            for key, entry in layout.items():
+                if isinstance(entry, list):
+                    entry = {'identifier': identifiers[entry[0]],
+                             'position': self.position(dict(zip(self.POSITION_FIELDS, entry[1:])))}
+                else:
+                    entry = self.intern_entry(entry)
+                decoded[key] = entry
+        return layouts
+    
+    def _decode_value(self, field, value, strings):
+        if value is None:
+            return None
+        if field in self.STRING_FIELDS:
+            return strings[value]
+        if field == 'title_keywords':
+            return [strings[index] for index in value]
+        return value
+    
+    @classmethod
+    def encode(cls, layouts):
+        """The format 2 file contents for a {name: layout} dict"""
+        string_ids = {}
+        identifier_ids = {}
+        identifiers = []
+        
+        def string_id(text):
+            return string_ids.setdefault(text, len(string_ids))
+        
+        def identifier_id(identifier):
+            row = cls._encode_identifier(identifier, string_id)
+            if row is None:
+                identifiers.append(identifier)
+                return len(identifiers) - 1
+            key = tuple(tuple(value) if isinstance(value, list) else value for value in row)
+            if key not in identifier_ids:
+                identifier_ids[key] = len(identifiers)
+                identifiers.append(row)
+            return identifier_ids[key]
+        
+        encoded_layouts = {}
+        for name, layout in layouts.items():
+            encoded_layouts[name] = encoded = {}
+            for key, entry in layout.items():
+                if (isinstance(entry, dict) and entry.keys() == {'identifier', 'position'}
+                        and isinstance(entry['identifier'], dict) and isinstance(entry['position'], dict)
+                        and entry['position'].keys() == set(cls.POSITION_FIELDS)):
+                    position = entry['position']
+                    entry = [identifier_id(entry['identifier'])] + [position[field] for field in cls.POSITION_FIELDS]
+                encoded[key] = entry
+        return {'format': cls.FORMAT, 'strings': list(string_ids), 'identifiers': identifiers,
+                'layouts': encoded_layouts}
+    
+    @classmethod
+    def _encode_identifier(cls, identifier, string_id):
+        """A row of string IDs and numbers, or None if identifier needs storing as-is"""
+        if identifier.keys() != SmartIdentifier._field_set:
+            return None
+        row = []
+        for field in cls.IDENTIFIER_FIELDS:
+            value = identifier[field]
+            if value is None:
+                pass
+            elif field in cls.STRING_FIELDS:
+                if not isinstance(value, str):
+                    return None
+                value = string_id(value)
+            elif field == 'title_keywords':
+                if not isinstance(value, list) or not all(isinstance(keyword, str) for keyword in value):
+                    return None
+                value = [string_id(keyword) for keyword in value]
+            elif isinstance(value, (str, list, dict)):
+                return None
+            row.append(value)
+        return row
+
+
+class JournaledLayoutStore(MutableMapping):
+    """Layout library kept as a JSON snapshot plus an append-only journal (see README)"""
+    
+    def __init__(self, path, compact_min_bytes=256 * 1024):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.compact_min_bytes = compact_min_bytes
+        self.layouts = {}
+        self.pool = LayoutPool()
+        self.snapshot_bytes = 0
+        self.journal_bytes = 0
+        self.load()
+    
+    def load(self):
+        """(Re)read the snapshot and replay the journal on top of it"""
+        self.layouts = {}
+        self.pool = LayoutPool()
+        self.snapshot_bytes = 0
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            self.snapshot_bytes = len(text)
+            self.layouts = self.pool.decode(json.loads(text))
+        except (OSError, ValueError, KeyError, IndexError, TypeError, AttributeError):
+            pass  # Missing or unreadable snapshot, start empty
+        self.journal_bytes = self._replay()
+    
+    def _replay(self):
+        try:
+            with open(self.journal_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return 0
+        lines = data.split(b"\n")
+        tail = lines.pop()  # Empty unless the last append was torn
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                self._apply(json.loads(line))
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                print(f"Skipping bad record {number} in {self.journal_path}: {e!r}")
+        offset = len(data) - len(tail)
+        if tail:
+            # Cut the torn tail so later appends start on a clean line
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(offset)
+        return offset
+    
+    def _apply(self, record):
+        if record['op'] == 'put':
+            self.layouts[record['name']] = self.pool.intern_layout(record['layout'])
+        elif record['op'] == 'delete':
+            self.layouts.pop(record['name'], None)
+    
+    def _append(self, record):
+        line = (json.dumps(record) + "\n").encode('utf-8')
+        with open(self.journal_path, 'ab') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self.journal_bytes += len(line)
+    
+    def __getitem__(self, name):
+        return self.layouts[name]
+    
+    def __iter__(self):
+        return iter(self.layouts)
+    
+    def __len__(self):
+        return len(self.layouts)
+    
+    def entry_count(self, name):
+        return len(self.layouts[name])
+    
+    def __setitem__(self, name, layout):
+        self._append({'op': 'put', 'name': name, 'layout': layout})
+        self.layouts[name] = self.pool.intern_layout(layout)
+        self._maybe_compact()
+    
+    def __delitem__(self, name):
+        if name not in self.layouts:
+            raise KeyError(name)
+        self._append({'op': 'delete', 'name': name})
+        del self.layouts[name]
+        self._maybe_compact()
+    
+    def _maybe_compact(self):
+        if self.journal_bytes > max(self.compact_min_bytes, self.snapshot_bytes):
+            # The record is already journaled, so a failed compaction loses nothing
+            try:
+                self.compact()
+            except (OSError, ValueError, TypeError) as e:
+                print(f"Failed to compact {self.path}, keeping the journal: {e}")
+    
+    def compact(self):
+        """Fold the journal into a new snapshot, replaced atomically"""
+        text = json.dumps(LayoutPool.encode(self.layouts), separators=(',', ':'))
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        # Replaying the old journal over the new snapshot would be harmless,
+        # so a crash before this point loses nothing
+        with open(self.journal_path, 'wb'):
+            pass
+        self.snapshot_bytes = len(text)
+        self.journal_bytes = 0
+        # Start a fresh pool so strings of deleted layouts are released
+        self.pool = LayoutPool()
+        self.layouts = {name: self.pool.intern_layout(layout) for name, layout in self.layouts.items()}
+    
+    def close(self):
+        pass  # Files are only open while writing
+
+
+class SQLiteLayoutStore(MutableMapping):
+    """Layout library in an SQLite database, read one layout at a time"""
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS layouts (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            entry_count INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS identifiers (
+            id INTEGER PRIMARY KEY,
+            app_type TEXT,
+            process_name TEXT,
+            class_name TEXT,
+            title_keywords TEXT,
+            clean_title TEXT,
+            title_length INTEGER,
+            original_title TEXT,
+            process_pid INTEGER,
+            exe_path TEXT,
+            position_x INTEGER,
+            position_y INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS entries (
+            layout_id INTEGER NOT NULL REFERENCES layouts(id) ON DELETE CASCADE,
+            entry_key TEXT NOT NULL,
+            identifier_id INTEGER NOT NULL REFERENCES identifiers(id),
+            x INTEGER,
+            y INTEGER,
+            width INTEGER,
+            height INTEGER,
+            PRIMARY KEY (layout_id, entry_key)
+        );
+        CREATE INDEX IF NOT EXISTS entries_identifier ON entries(identifier_id);
+        CREATE INDEX IF NOT EXISTS identifiers_app ON identifiers(app_type, process_name);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+    IDENTIFIER_COLUMNS = ('app_type', 'process_name', 'class_name', 'title_keywords', 'clean_title',
+                          'title_length', 'original_title', 'process_pid', 'exe_path',
+                          'position_x', 'position_y')
+    POSITION_COLUMNS = ('x', 'y', 'width', 'height')
+    FIND_IDENTIFIER = ("SELECT id FROM identifiers WHERE "
+                       + " AND ".join(f"{column} IS ?" for column in IDENTIFIER_COLUMNS))
+    
+    def __init__(self, path, import_from=None, cache_size=8):
+        self.path = path
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.executescript(self.SCHEMA)
+        self._load_index()
+        if import_from and self.db.execute("SELECT 1 FROM meta WHERE key = 'json_imported'").fetchone() is None:
+            try:
+                self._transaction(self._import_json, import_from)
+            except (sqlite3.Error, ValueError, TypeError, AttributeError) as e:
+                print(f"Failed to import layouts from {import_from}, retrying on next start: {e}")
+    
+    def _load_index(self):
+        self._ids = {}
+        self._counts = {}
+        for layout_id, name, count in self.db.execute(
+                "SELECT id, name, entry_count FROM layouts ORDER BY id"):
+            self._ids[name] = layout_id
+            self._counts[name] = count
+    
+    def _transaction(self, func, *args):
+        try:
+            with self.db:
+                func(*args)
+        except Exception:
+            self._load_index()  # The transaction rolled back; so does the index
+            raise
+    
+    def _import_json(self, path):
+        # Only a database nothing was saved to yet takes the JSON library;
+        # the marker commits with the imported layouts
+        if not self._ids and (os.path.exists(path) or os.path.exists(path + ".journal")):
+            for name, layout in JournaledLayoutStore(path).items():
+                self._write(name, layout)
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_imported', ?)", (path,))
+    
+    def close(self):
+        self.db.close()
+    
+    def __getitem__(self, name):
+        if name in self._cache:
+            self._cache.move_to_end(name)
+            return self._cache[name]
+        layout = self._read(self._ids[name])
+        self._cache[name] = layout
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return layout
+    
+    def __contains__(self, name):
+        return name in self._ids
+    
+    def __iter__(self):
+        return iter(list(self._ids))
+    
+    def __len__(self):
+        return len(self._ids)
+    
+    def entry_count(self, name):
+        return self._counts[name]
+    
+    def __setitem__(self, name, layout):
+        self._cache.pop(name, None)
+        self._transaction(self._write, name, layout)
+    
+    def __delitem__(self, name):
+        if name not in self._ids:
+            raise KeyError(name)
+        self._cache.pop(name, None)
+        self._transaction(self._delete, name)
+    
+    def _read(self, layout_id):
+        columns = ", ".join(f"i.{column}" for column in self.IDENTIFIER_COLUMNS)
+        rows = self.db.execute(
+            f"SELECT e.entry_key, e.x, e.y, e.width, e.height, e.identifier_id, {columns} "
+            "FROM entries e JOIN identifiers i ON i.id = e.identifier_id "
+            "WHERE e.layout_id = ? ORDER BY e.rowid", (layout_id,))
+        layout = {}
+        identifiers = {}
+        for row in rows:
+            position = dict(zip(self.POSITION_COLUMNS, row[1:5]))
+            identifier = identifiers.get(row[5])
+            if identifier is None:
+                identifier = dict(zip(self.IDENTIFIER_COLUMNS, row[6:]))
+                if identifier['title_keywords'] is not None:
+                    identifier['title_keywords'] = json.loads(identifier['title_keywords'])
+                identifiers[row[5]] = identifier
+            layout[row[0]] = {'identifier': identifier, 'position': position}
+        return layout
+    
+    def _write(self, name, layout):
+        layout_id = self._ids.get(name)
+        if layout_id is None:
+            layout_id = self.db.execute("INSERT INTO layouts (name, entry_count) VALUES (?, ?)",
+                                        (name, len(layout))).lastrowid
+        else:
+            # Overwrite in place so the layout keeps its position in the list
+            self._delete_entries(layout_id)
+            self.db.execute("UPDATE layouts SET entry_count = ? WHERE id = ?", (len(layout), layout_id))
+        for key, entry in layout.items():
+            identifier = dict(entry.get('identifier', {}))
+            if identifier.get('title_keywords') is not None:
+                identifier['title_keywords'] = json.dumps(list(identifier['title_keywords']))
+            values = [identifier.get(column) for column in self.IDENTIFIER_COLUMNS]
+            # Entries of any layout that saw the same window share its row
+            existing = self.db.execute(self.FIND_IDENTIFIER, values).fetchone()
+            if existing:
+                identifier_id = existing[0]
+            else:
+                identifier_id = self.db.execute(
+                    f"INSERT INTO identifiers ({', '.join(self.IDENTIFIER_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(self.IDENTIFIER_COLUMNS))})", values).lastrowid
+            position = entry.get('position', {})
+            self.db.execute(
+                "INSERT INTO entries (layout_id, entry_key, identifier_id, x, y, width, height) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [layout_id, key, identifier_id] + [position.get(column) for column in self.POSITION_COLUMNS])
+        self._ids[name] = layout_id
+        self._counts[name] = len(layout)
+    
+    def _delete(self, name):
+        layout_id = self._ids.pop(name)
+        del self._counts[name]
+        self._delete_entries(layout_id)
+        self.db.execute("DELETE FROM layouts WHERE id = ?", (layout_id,))
+    
+    def _delete_entries(self, layout_id):
+        identifier_ids = [row[0] for row in self.db.execute(
+            "SELECT identifier_id FROM entries WHERE layout_id = ?", (layout_id,))]
+        self.db.execute("DELETE FROM entries WHERE layout_id = ?", (layout_id,))
+        # Drop the identifiers no other entry still refers to
+        self.db.executemany(
+            "DELETE FROM identifiers WHERE id = ? "
+            "AND NOT EXISTS (SELECT 1 FROM entries WHERE identifier_id = ?)",
+            [(identifier_id, identifier_id) for identifier_id in identifier_ids])
+
+
+class SnapshotWorker:
+    """Takes window snapshots on a background thread and queues them for the UI"""
+    
+    def __init__(self, core, coalesce_ms=100, poll_ms=2000):
+        self.core = core
+        self.coalesce_ms = coalesce_ms
+        self.poll_ms = poll_ms
+        self.polling = False
+        self.results = queue.Queue()
+        self.events_received = 0
+        self._lock = threading.Lock()
+        self._full = False
+        self._dirty = set()
+        self._callbacks = []
+        self._answered = queue.Queue()
+        self._requested = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="window-snapshots", daemon=True)
+        self._thread.start()
+    
+    def request(self, callback=None):
+        """Ask for a full pass; callback is handed its snapshot through answered()"""
+        with self._lock:
+            self._full = True
+            if callback is not None:
+                self._callbacks.append(callback)
+        self._requested.set()
+    
+    def start_tracking(self):
+        """Follow backend window events, or poll every poll_ms if the backend has none"""
+        if not self.core.backend.subscribe_events(self._on_event, self.start_polling):
+            self.start_polling()
+    
+    def start_polling(self):
+        self.polling = True
+        self._requested.set()  # Wake the thread so it starts waiting with a timeout
+    
+    def stop_tracking(self):
+        self.polling = False
+        self.core.backend.unsubscribe_events()
+    
+    def _on_event(self, kind, hwnd):
+        with self._lock:
+            self.events_received += 1
+            self._dirty.add(hwnd)
+        self._requested.set()
+    
+    def _run(self):
+        published = None
+        while True:
+            if not self._requested.wait(self.poll_ms / 1000 if self.polling else None):
+                self.request()  # Nothing reports changes, so look again
+            with self._lock:
+                full = self._full
+            if not full:
+                # Let the rest of an event burst arrive
+                time.sleep(self.coalesce_ms / 1000)
+            with self._lock:
+                self._requested.clear()
+                full, dirty, callbacks = self._full, self._dirty, self._callbacks
+                self._full = False
+                self._dirty = set()
+                self._callbacks = []
+            try:
+                snapshot = self.core.capture_snapshot(None if full else dirty)
+            except Exception as e:
+                self.results.put(e)
+                continue
+            # Nothing changed since the last pass, nothing to render
+            if snapshot.generation != published:
+                published = snapshot.generation
+                self.results.put(snapshot)
+            for callback in callbacks:
+                self._answered.put((callback, snapshot))
+    
+    def latest(self):
+        """Return the newest result not yet taken, or None; older ones are dropped"""
+        result = None
+        while True:
+            try:
+                result = self.results.get_nowait()
+            except queue.Empty:
+                return result
+    
+    def answered(self):
+        """Return the (callback, snapshot) pairs of finished requests"""
+        answered = []
+        while True:
+            try:
+                answered.append(self._answered.get_nowait())
+            except queue.Empty:
+                return answered
+
+
+class SelectionModel:
+    """Insertion-ordered set of selected hwnds, notifying listeners once per changing call"""
+    
+    def __init__(self):
+        self._hwnds = {}  # hwnd -> None, in selection order
+        self._listeners = []
+    
+    def __contains__(self, hwnd):
+        return hwnd in self._hwnds
+    
+    def __len__(self):
+        return len(self._hwnds)
+    
+    def __iter__(self):
+        return iter(self._hwnds)
+    
+    def hwnds(self):
+        """Selected hwnds in the order they were selected"""
+        return list(self._hwnds)
+    
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+    
+    def _changed(self):
+        for callback in self._listeners:
+            callback()
+    
+    def toggle(self, hwnd):
+        if self._hwnds.pop(hwnd, False) is False:
+            self._hwnds[hwnd] = None
+        self._changed()
+    
+    def select(self, hwnds):
+        count = len(self._hwnds)
+        self._hwnds.update(dict.fromkeys(hwnds))
+        if len(self._hwnds) != count:
+            self._changed()
+    
+    def deselect(self, hwnds):
+        count = len(self._hwnds)
+        for hwnd in hwnds:
+            self._hwnds.pop(hwnd, None)
+        if len(self._hwnds) != count:
+            self._changed()
+    
+    def invert(self, hwnds):
+        """Toggle every hwnd in hwnds"""
+        hwnds = list(dict.fromkeys(hwnds))
+        for hwnd in hwnds:
+            if self._hwnds.pop(hwnd, False) is False:
+                self._hwnds[hwnd] = None
+        if hwnds:
+            self._changed()
+    
+    def clear(self):
+        if self._hwnds:
+            self._hwnds.clear()
+            self._changed()
+    
+    def prune(self, alive):
+        """Drop hwnds that are no longer in alive (anything supporting `in`)"""
+        stale = [hwnd for hwnd in self._hwnds if hwnd not in alive]
+        self.deselect(stale)
+
+
+class _ScheduledTask:
+    __slots__ = ('kind', 'priority', 'due', 'seq', 'func', 'steps')
+    
+    def __init__(self, kind, priority, due, seq, func):
+        self.kind = kind
+        self.priority = priority
+        self.due = due
+        self.seq = seq
+        self.func = func
+        self.steps = None  # generator once a chunked task has started
+
+
+class TaskScheduler:
+    """Coalescing, cancellable scheduler for UI recomputation on the Tk loop"""
+    
+    PRIORITIES = {'interactive': 0, 'preview': 1, 'background': 2}
+    
+    def __init__(self, after, after_cancel):
+        self._after = after
+        self._after_cancel = after_cancel
+        self._tasks = {}  # kind -> _ScheduledTask
+        self._seq = itertools.count()
+        self._after_id = None
+        self._wake_at = None
+        self.submitted = 0
+        self.completed = 0
+        self.cancelled = 0
+    
+    def submit(self, kind, func, priority='interactive', delay_ms=0):
+        """Schedule func to run after delay_ms, replacing any task of the same kind"""
+        if kind in self._tasks:
+            self.cancel(kind)
+        self._tasks[kind] = _ScheduledTask(kind, self.PRIORITIES[priority],
+                                           time.monotonic() + delay_ms / 1000, next(self._seq), func)
+        self.submitted += 1
+        self._wake()
+    
+    def cancel(self, kind):
+        """Drop the pending or running task of this kind, if any"""
+        task = self._tasks.pop(kind, None)
+        if task is None:
+            return False
+        if task.steps is not None and not task.steps.gi_running:
+            task.steps.close()
+        self.cancelled += 1
+        return True
+    
+    def depth(self):
+        """Number of tasks waiting or in progress"""
+        return len(self._tasks)
+    
+    def stats(self):
+        return {'depth': self.depth(), 'submitted': self.submitted,
+                'completed': self.completed, 'cancelled': self.cancelled}
+    
+    def _wake(self):
+        """(Re)arm the tick for the earliest due task"""
+        if not self._tasks:
+            return
+        wake_at = min(task.due for task in self._tasks.values())
+        if self._after_id is not None:
+            if self._wake_at <= wake_at:
+                return
+            self._after_cancel(self._after_id)
+        self._wake_at = wake_at
+        self._after_id = self._after(max(0, int((wake_at - time.monotonic()) * 1000)), self._tick)
+    
+    def _tick(self):
+        self._after_id = None
+        try:
+            now = time.monotonic()
+            due = [task for task in self._tasks.values() if task.due <= now]
+            if due:
+                self._step(min(due, key=lambda task: (task.priority, task.seq)))
+        finally:
+            self._wake()
+    
+    def _step(self, task):
+        """Run task or its next step, retiring it unless more steps remain"""
+        finished = True
+        try:
+            if task.steps is None:
+                result = task.func()
+                if isinstance(result, types.GeneratorType):
+                    task.steps = result
+            if task.steps is not None:
+                next(task.steps)
+                finished = False
+        except StopIteration:
+            pass
+        finally:
+            if finished and self._tasks.get(task.kind) is task:
+                del self._tasks[task.kind]
+                self.completed += 1
 
-class WindowResizerTool:
-    def __init__(self):
+
+class _GroupHeaderRow:
+    """Recyclable row widget for an app group header in VirtualWindowList"""
+    
+    kind = 'group'
+    
+    def __init__(self, window_list):
+        self.tool = window_list.tool
+        self.app_type = None
+        self.app_windows = []
+        self.state = None  # what the widgets currently show
+        self.y = None
+        self.frame = ctk.CTkFrame(window_list.viewport, height=VirtualWindowList.GROUP_ROW_HEIGHT - 10)
+        self.frame.pack_propagate(False)
+        
+        # Collapse/expand button
+        self.collapse_btn = ctk.CTkButton(self.frame, text="▼", width=30, height=30,
+                                          command=lambda: self.tool.toggle_group_collapse(self.app_type))
+        self.collapse_btn.pack(side="left", padx=10, pady=8)
+        
+        # App icon and name
+        self.header_label = ctk.CTkLabel(self.frame, text="", font=window_list.fonts['group'])
+        self.header_label.pack(side="left", padx=5, pady=8)
+        
+        # Group select button
+        self.group_select_btn = ctk.CTkButton(self.frame, text="Select All", width=80, height=25,
+                                              command=lambda: self.tool.select_app_group(self.app_type))
+        self.group_select_btn.pack(side="right", padx=15, pady=8)
+    
+    def update(self, item):
+        """Show item, touching only the widgets whose content changed"""
+        _, self.app_type, self.app_windows, is_collapsed = item
+        state = (self.app_type, len(self.app_windows), is_collapsed)
+        if state == self.state:
+            return
+        if self.state is None or state[2] != self.state[2]:
+            self.collapse_btn.configure(text="▶" if is_collapsed else "▼")
+        if self.state is None or state[:2] != self.state[:2]:
+            self.header_label.configure(
+                text=f"{self.tool.get_app_display_name(self.app_type)} ({len(self.app_windows)})")
+        self.state = state
+
+
+class _WindowRow:
+    """Recyclable row widget for a single window in VirtualWindowList"""
+    
+    kind = 'window'
+    
+    def __init__(self, window_list):
+        self.tool = window_list.tool
+        self.hwnd = None
+        self.state = None  # what the labels currently show
+        self.checked = None
+        self.y = None
+        self.frame = ctk.CTkFrame(window_list.viewport, height=VirtualWindowList.WINDOW_ROW_HEIGHT - 4)
+        self.frame.pack_propagate(False)
+        
+        # Checkbox
+        self.checkbox = ctk.CTkCheckBox(self.frame, text="",
+                                        command=lambda: self.tool.on_window_select(self.hwnd))
+        self.checkbox.pack(side="left", padx=10, pady=8)
+        
+        # Window size info
+        self.size_label = ctk.CTkLabel(self.frame, text="", font=window_list.fonts['size'],
+                                       text_color="lightgray")
+        self.size_label.pack(side="right", padx=10, pady=8)
+        
+        # Window info container
+        info_frame = ctk.CTkFrame(self.frame)
+        info_frame.pack(side="left", fill="both", expand=True, padx=5, pady=5)
+        
+        self.title_label = ctk.CTkLabel(info_frame, text="", font=window_list.fonts['title'], height=18)
+        self.title_label.pack(anchor="w", padx=10, pady=(3, 0))
+        
+        self.subtitle_label = ctk.CTkLabel(info_frame, text="", font=window_list.fonts['subtitle'],
+                                           text_color="gray", height=14)
+        self.subtitle_label.pack(anchor="w", padx=10, pady=(0, 3))
+    
+    def update(self, item):
+        """Show item, touching only the widgets whose content changed"""
+        window_info = item[1]
+        self.hwnd = window_info['hwnd']
+        state = (self.hwnd, window_info['title'], window_info['rect'], window_info['process_name'],
+                 window_info['pid'])
+        if state != self.state:
+            title_text, subtitle, size_text = self.tool.describe_window(window_info)
+            self.title_label.configure(text=title_text)
+            self.subtitle_label.configure(text=subtitle)
+            self.size_label.configure(text=size_text)
+            self.state = state
+        self.sync_selection()
+    
+    def sync_selection(self):
+        checked = self.hwnd in self.tool.selection
+        if checked == self.checked:
+            return
+        if checked:
+            self.checkbox.select()
+        else:
+            self.checkbox.deselect()
+        self.checked = checked
+
+
+class VirtualWindowList:
+    """Scrollable window list that only creates widgets for the rows in view"""
+    
+    GROUP_ROW_HEIGHT = 56
+    WINDOW_ROW_HEIGHT = 64
+    OVERSCAN = 3  # rows rendered beyond each edge of the viewport
+    
+    def __init__(self, parent, tool):
+        self.tool = tool
+        self.items = []
+        self.keys = []
+        self.offsets = [0]  # offsets[i] = top of item i, offsets[-1] = total height
+        self.scroll_offset = 0
+        self.active = {}  # item key -> row widget
+        self.pools = {'group': [], 'window': []}
+        self.fonts = {
+            'group': ctk.CTkFont(size=14, weight="bold"),
+            'title': ctk.CTkFont(size=12, weight="bold"),
+            'subtitle': ctk.CTkFont(size=10),
+            'size': ctk.CTkFont(size=9),
+        }
+        
+        self.container = ctk.CTkFrame(parent, height=400)
+        self.container.grid_rowconfigure(0, weight=1)
+        self.container.grid_columnconfigure(0, weight=1)
+        
+        self.viewport = ctk.CTkFrame(self.container, fg_color="transparent")
+        self.viewport.grid(row=0, column=0, sticky="nsew")
+        self.viewport.bind("<Configure>", lambda event: self.render())
+        
+        self.scrollbar = ctk.CTkScrollbar(self.container, command=self.yview)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        
+        self.viewport.bind_all("<MouseWheel>", self._on_mousewheel, add="+")
+        self.viewport.bind_all("<Button-4>", self._on_mousewheel, add="+")
+        self.viewport.bind_all("<Button-5>", self._on_mousewheel, add="+")
+    
+    def grid(self, **kwargs):
+        self.container.grid(**kwargs)
+    
+    @staticmethod
+    def item_key(item):
+        """Stable identity of a list item across refreshes"""
+        if item[0] == 'group':
+            return ('group', item[1])
+        return ('window', item[1]['hwnd'])
+    
+    def set_items(self, items):
+        """Reconcile the list with new contents and re-render the visible rows"""
+        self.items = items
+        self.keys = [self.item_key(item) for item in items]
+        self.offsets = [0]
+        for item in items:
+            height = self.GROUP_ROW_HEIGHT if item[0] == 'group' else self.WINDOW_ROW_HEIGHT
+            self.offsets.append(self.offsets[-1] + height)
+        self.render(rebind=True)
+    
+    def window_hwnds(self):
+        """Handles of every window row in the list, rendered or not"""
+        return [item[1]['hwnd'] for item in self.items if item[0] == 'window']
+    
+    def refresh_selection(self):
+        """Sync the rendered checkboxes with the tool's selection"""
+        for row in self.active.values():
+            if row.kind == 'window':
+                row.sync_selection()
+    
+    def _view_height(self):
+        scaling = ctk.ScalingTracker.get_widget_scaling(self.viewport)
+        return max(self.viewport.winfo_height() / scaling, 1)
+    
+    def _acquire(self, kind):
+        pool = self.pools[kind]
+        if pool:
+            return pool.pop()
+        return _GroupHeaderRow(self) if kind == 'group' else _WindowRow(self)
+    
+    def _release(self, key):
+        row = self.active.pop(key)
+        row.frame.place_forget()
+        row.y = None
+        self.pools[row.kind].append(row)
+    
+    def render(self, rebind=False):
+        """Bind and place the rows in view; rows staying in view only move unless rebind is set"""
+        view_height = self._view_height()
+        total_height = self.offsets[-1]
+        self.scroll_offset = max(0, min(self.scroll_offset, total_height - view_height))
+        
+        overscan = self.OVERSCAN * self.WINDOW_ROW_HEIGHT
+        first = max(bisect.bisect_right(self.offsets, self.scroll_offset - overscan) - 1, 0)
+        last = min(bisect.bisect_left(self.offsets, self.scroll_offset + view_height + overscan),
+                   len(self.items))
+        
+        visible = set(self.keys[first:last])
+        for key in list(self.active):
+            if key not in visible:
+                self._release(key)
+        
+        for index in range(first, last):
+            key = self.keys[index]
+            row = self.active.get(key)
+            if row is None:
+                row = self.active[key] = self._acquire(key[0])
+                row.update(self.items[index])
+            elif rebind:
+                row.update(self.items[index])
+            y = self.offsets[index] - self.scroll_offset
+            if y != row.y:
+                row.frame.place(x=0, y=y, relwidth=1)
+                row.y = y
+        
+        if total_height > 0:
+            self.scrollbar.set(self.scroll_offset / total_height,
+                               min((self.scroll_offset + view_height) / total_height, 1))
+        else:
+            self.scrollbar.set(0, 1)
+    
+    def scroll_to(self, offset):
+        self.scroll_offset = offset
+        self.render()
+    
+    def yview(self, *args):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', amount, 'units'|'pages')"""
+        if args[0] == 'moveto':
+            self.scroll_to(float(args[1]) * self.offsets[-1])
+        elif args[0] == 'scroll':
+            step = self._view_height() if args[2] == 'pages' else self.WINDOW_ROW_HEIGHT
+            self.scroll_to(self.scroll_offset + int(args[1]) * step)
+    
+    def _contains(self, widget):
+        while widget is not None:
+            if widget is self.viewport:
+                return True
+            widget = getattr(widget, 'master', None)
+        return False
+    
+    def _on_mousewheel(self, event):
+        if not self._contains(event.widget):
+            return
+        if event.num == 4:
+            rows = -1
+        elif event.num == 5:
+            rows = 1
+        else:
+            rows = -event.delta / 120
+        self.scroll_to(self.scroll_offset + rows * self.WINDOW_ROW_HEIGHT)
+
+
+class WindowResizerTool(WindowManagerCore):
+    def __init__(self, backend=None, layout_storage="json"):
+        super().__init__(backend)
+        self.layout_storage = layout_storage
         self.root = ctk.CTk()
         self.root.title("Smart Window Manager Pro")
         self.root.geometry("900x800")
@@ -26,208 +2768,42 @@ class WindowResizerTool:
         
         # File to store layouts
         self.layouts_file = "window_layouts.json"
+        self.layouts_db = "window_layouts.db"
         self.layouts = self.load_layouts()
+        # Bumped whenever a layout is saved or deleted, keys the match cache
+        self.layout_revisions = {}
         
         # Window data
         self.windows = []
-        self.selected_windows = []
+        self.selection = SelectionModel()
+        self.selection.add_listener(self.on_selection_changed)
         self.window_groups = {}  # Group windows by application
         
         # Collapsible groups state
         self.collapsed_groups = {}
         
-        self.create_widgets()
-        self.refresh_windows()
-    
-    def get_window_info(self, hwnd):
-        """Get comprehensive window information for smart matching"""
-        try:
-            # Basic window info
-            title = win32gui.GetWindowText(hwnd)
-            class_name = win32gui.GetClassName(hwnd)
-            
-            # Process info
-            _, pid = win32process.GetWindowThreadProcessId(hwnd)
-            try:
-                process = psutil.Process(pid)
-                process_name = process.name()
-                exe_path = process.exe()
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                process_name = "Unknown"
-                exe_path = ""
-            
-            # Window position and size
-            rect = win32gui.GetWindowRect(hwnd)
-            
-            return {
-                'hwnd': hwnd,
-                'title': title,
-                'class_name': class_name,
-                'process_name': process_name,
-                'exe_path': exe_path,
-                'pid': pid,
-                'rect': rect,
-                'width': rect[2] - rect[0],
-                'height': rect[3] - rect[1]
-            }
-        except Exception:
-            return None
-    
-    def create_smart_identifier(self, window_info):
-        """Create a smart identifier for a window with better multi-instance support"""
-        # Extract core application name from process
-        process_base = window_info['process_name'].lower().replace('.exe', '')
-        
-        # Create title patterns for matching
-        title_words = re.findall(r'\b\w+\b', window_info['title'].lower())
-        
-        # Enhanced app identifiers with better matching
-        app_identifiers = {
-            'brave': ['brave', 'brave-browser'],
-            'chrome': ['chrome', 'google chrome'],
-            'firefox': ['firefox', 'mozilla'],
-            'code': ['visual studio code', 'code', 'vscode'],
-            'notepad': ['notepad'],
-            'notepad++': ['notepad++', 'npp'],
-            'explorer': ['file explorer', 'windows explorer'],
-            'cmd': ['command prompt', 'cmd'],
-            'powershell': ['powershell'],
-            'terminal': ['terminal', 'windows terminal'],
-            'discord': ['discord'],
-            'spotify': ['spotify'],
-            'steam': ['steam'],
-            'obs': ['obs studio', 'obs'],
-            'slack': ['slack'],
-            'teams': ['microsoft teams', 'teams'],
-            'excel': ['excel', 'microsoft excel'],
-            'word': ['word', 'microsoft word'],
-            'outlook': ['outlook', 'microsoft outlook'],
-            'pycharm': ['pycharm'],
-            'intellij': ['intellij', 'idea'],
-            'sublime': ['sublime text', 'sublime'],
-            'atom': ['atom'],
-            'git': ['git', 'github desktop']
-        }
-        
-        # Find app type with process name priority
-        app_type = process_base
-        for app_key, keywords in app_identifiers.items():
-            if any(keyword in process_base for keyword in keywords):
-                app_type = app_key
-                break
-            elif any(keyword in window_info['title'].lower() for keyword in keywords):
-                app_type = app_key
-                break
+        # Recomputation triggered from the UI runs through the scheduler
+        self.scheduler = TaskScheduler(self.root.after, self.root.after_cancel)
         
-        # Extract meaningful parts of title for better matching
-        # Remove common prefixes/suffixes that change frequently
-        clean_title = window_info['title']
-        # Remove common browser suffixes
-        clean_title = re.sub(r' - (Google Chrome|Mozilla Firefox|Brave|Microsoft Edge)$', '', clean_title)
-        # Remove VSCode workspace indicators
-        clean_title = re.sub(r' - Visual Studio Code$', '', clean_title)
-        # Extract file/folder names for editors
-        if app_type in ['code', 'sublime', 'atom', 'notepad++']:
-            # Try to extract the main file/folder being edited
-            title_parts = clean_title.split(' - ')
-            if len(title_parts) > 1:
-                clean_title = title_parts[0]  # Usually the file/project name
+        # Search filters the captured snapshot, debounced while typing
+        self.search_index = self.create_search_index([])
+        self.search_debounce_ms = 100
         
-        # For browsers, try to extract domain or main content
-        if app_type in ['brave', 'chrome', 'firefox']:
-            # Look for domain patterns or meaningful content identifiers
-            url_match = re.search(r'https?://([^/\s]+)', clean_title)
-            if url_match:
-                clean_title = url_match.group(1)
-            else:
-                # Take first few words of title
-                words = clean_title.split()
-                clean_title = ' '.join(words[:3]) if len(words) > 3 else clean_title
+        # Windows are enumerated off the UI thread and picked up by polling
+        self.snapshot = self.last_snapshot
+        self.snapshot_worker = SnapshotWorker(self)
+        self.snapshot_worker.start_tracking()
+        self.snapshot_poll_ms = 50
+        # Layout cards re-match after windows stop moving, not on every step
+        self.layout_settle_ms = 500
         
-        return {
-            'app_type': app_type,
-            'process_name': window_info['process_name'],
-            'class_name': window_info['class_name'],
-            'title_keywords': re.findall(r'\b\w+\b', clean_title.lower())[:5],
-            'clean_title': clean_title,
-            'title_length': len(window_info['title']),
-            'original_title': window_info['title'],
-            'process_pid': window_info['pid'],
-            'exe_path': window_info.get('exe_path', ''),
-            # Add position info to help distinguish windows
-            'position_x': window_info['rect'][0],
-            'position_y': window_info['rect'][1]
-        }
+        self.create_widgets()
+        self.refresh_windows()
+        self.poll_snapshots()
     
-    def match_window_smart(self, identifier, current_windows):
-        """Enhanced smart matching algorithm for better multi-instance support"""
-        matches = []
-        
-        for window_info in current_windows:
-            score = 0
-            current_identifier = self.create_smart_identifier(window_info)
-            
-            # Process name match (highest priority)
-            if identifier['process_name'] == window_info['process_name']:
-                score += 60
-            
-            # App type match (high priority)
-            if identifier['app_type'] == current_identifier['app_type']:
-                score += 50
-            
-            # Class name match (high priority)
-            if identifier['class_name'] == window_info['class_name']:
-                score += 40
-            
-            # Executable path match (high priority for distinguishing instances)
-            if identifier.get('exe_path') and identifier['exe_path'] == current_identifier.get('exe_path'):
-                score += 35
-            
-            # Clean title matching (medium-high priority)
-            if identifier.get('clean_title') and current_identifier.get('clean_title'):
-                if identifier['clean_title'].lower() == current_identifier['clean_title'].lower():
-                    score += 45
-                elif identifier['clean_title'].lower() in current_identifier['clean_title'].lower():
-                    score += 25
-            
-            # Title keyword matching (medium priority)
-            if identifier.get('title_keywords') and current_identifier.get('title_keywords'):
-                matching_keywords = set(identifier['title_keywords']) & set(current_identifier['title_keywords'])
-                score += len(matching_keywords) * 8
-            
-            # Position similarity (low-medium priority - windows tend to stay in similar areas)
-            if identifier.get('position_x') and identifier.get('position_y'):
-                x_diff = abs(identifier['position_x'] - current_identifier.get('position_x', 0))
-                y_diff = abs(identifier['position_y'] - current_identifier.get('position_y', 0))
-                if x_diff < 100 and y_diff < 100:  # Within 100 pixels
-                    score += 15
-                elif x_diff < 300 and y_diff < 300:  # Within 300 pixels
-                    score += 8
-            
-            # Title length similarity (low priority)
-            if identifier.get('title_length'):
-                length_diff = abs(identifier['title_length'] - len(window_info['title']))
-                if length_diff < 10:
-                    score += 5
-                elif length_diff < 50:
-                    score += 2
-            
-            # Exact title match (bonus for perfect matches)
-            if identifier['original_title'] == window_info['title']:
-                score += 100
-            
-            # Store potential match with score
-            if score > 0:
-                matches.append((window_info, score, current_identifier))
-        
-        # Sort by score and return all matches above threshold
-        matches.sort(key=lambda x: x[1], reverse=True)
-        
-        # For debugging and multi-instance handling, return the best match
-        if matches:
-            return matches[0][0], matches[0][1]
-        
-        return None, 0
+    def report_error(self, title, message):
+        """Show errors as a message box"""
+        messagebox.showerror(title, message)
     
     def create_widgets(self):
         # Configure grid weights for responsive design
@@ -330,6 +2906,8 @@ class WindowResizerTool:
         
         self.layouts_listbox = ctk.CTkScrollableFrame(list_frame, height=150)
         self.layouts_listbox.grid(row=0, column=0, sticky="ew", padx=10, pady=10)
+        self.layout_cards = {}  # layout name -> (card, match label, details label)
+        self.no_layouts_label = None
         
         self.refresh_layouts_display()
     
@@ -386,9 +2964,13 @@ class WindowResizerTool:
                                           font=ctk.CTkFont(size=12))
         self.selection_label.grid(row=0, column=1, padx=10, pady=5, sticky="e")
         
-        # Scrollable window list with better height
-        self.window_listbox = ctk.CTkScrollableFrame(list_frame, height=400)
-        self.window_listbox.grid(row=1, column=0, sticky="nsew", padx=10, pady=10)
+        invert_btn = ctk.CTkButton(header_frame, text="Invert", width=70, height=25,
+                                   command=self.invert_selection)
+        invert_btn.grid(row=0, column=2, padx=10, pady=5)
+        
+        # Virtualized window list, only rows in view get widgets
+        self.window_list = VirtualWindowList(list_frame, self)
+        self.window_list.grid(row=1, column=0, sticky="nsew", padx=10, pady=10)
     
     def create_quick_actions_tab(self):
         """Create quick actions tab with position controls included"""
@@ -477,111 +3059,102 @@ class WindowResizerTool:
         ctk.CTkButton(row3, text="🔄 Minimize", command=lambda: self.quick_position("minimize"), **btn_style).pack(side="left", padx=8)
         ctk.CTkButton(row3, text="📺 Restore", command=lambda: self.quick_position("restore"), **btn_style).pack(side="left", padx=8)
     
-    def get_windows(self):
-        """Get all visible windows with comprehensive info"""
-        windows = []
-        
-        def enum_windows_callback(hwnd, results):
-            if win32gui.IsWindowVisible(hwnd):
-                window_info = self.get_window_info(hwnd)
-                if window_info and window_info['title'] and window_info['title'] != "Program Manager":
-                    windows.append(window_info)
-            return True
-        
-        win32gui.EnumWindows(enum_windows_callback, None)
-        return windows
-    
     def toggle_group_collapse(self, app_type):
         """Toggle collapse state for an app group"""
         self.collapsed_groups[app_type] = not self.collapsed_groups.get(app_type, False)
-        self.refresh_windows(self.search_entry.get().lower() if hasattr(self, 'search_entry') else "")
+        # Re-layout the windows we already have, no need to enumerate again
+        self.scheduler.submit('window-list', self.apply_search)
     
-    def refresh_windows(self, search_filter=""):
-        """Refresh the window list with detailed information and grouping"""
-        # Clear existing checkboxes
-        for widget in self.window_listbox.winfo_children():
-            widget.destroy()
-        
-        self.windows = self.get_windows()
-        self.window_checkboxes = {}
+    def refresh_windows(self):
+        """Ask the background worker for a fresh window snapshot"""
+        self.snapshot_worker.request()
+    
+    def poll_snapshots(self):
+        """Show the latest completed snapshot, if any, then poll again"""
+        result = self.snapshot_worker.latest()
+        if isinstance(result, Exception):
+            self.report_error("Error", f"Failed to list windows: {str(result)}")
+        elif result is not None:
+            self.scheduler.submit('snapshot', lambda: self.show_snapshot(result), 'background')
+        for callback, snapshot in self.snapshot_worker.answered():
+            callback(snapshot)
+        self.root.after(self.snapshot_poll_ms, self.poll_snapshots)
+    
+    def show_snapshot(self, snapshot):
+        """Render a window snapshot in the window list and layout cards"""
+        previous = self.snapshot
+        # Already shown, e.g. by a layout load that needed a fresh snapshot
+        if previous is not None and snapshot.generation <= previous.generation:
+            return
+        diff = snapshot.diff
+        incremental = (previous is not None and diff is not None
+                       and snapshot.generation == previous.generation + 1)
+        before = {hwnd: self.registry.get(hwnd) for hwnd in diff.changed} if incremental else {}
+        
+        self.snapshot = snapshot
+        self.windows = snapshot.windows
+        self.registry.update(snapshot)
+        # Closed windows can't stay selected
+        self.selection.prune(self.registry)
+        self.match_cache.invalidate_snapshots(snapshot.generation)
+        self.search_index = WindowSearchIndex(snapshot.windows, snapshot.app_types, self.search_index)
+        self.update_window_list(self.search_entry.get().lower())
+        
+        # Windows that only moved change nothing but the position bonus, so
+        # wait for them to settle instead of re-matching on every step
+        moved_only = (incremental and not diff.added and not diff.removed
+                      and all(before[hwnd] is not None
+                              and before[hwnd].moved(self.registry.get(hwnd).rect) == self.registry.get(hwnd)
+                              for hwnd in diff.changed))
+        if moved_only and not diff.changed:
+            return
         
+        # Update layouts display if we're on that tab
+        try:
+            self.refresh_layouts_display(delay_ms=self.layout_settle_ms if moved_only else 0)
+        except:
+            pass  # Layouts tab might not be created yet
+    
+    def update_window_list(self, search_filter=""):
+        """Reconcile the window list with self.windows without re-enumerating"""
         # Filter windows based on search
-        filtered_windows = []
-        for window_info in self.windows:
-            if search_filter:
-                if (search_filter in window_info['title'].lower() or 
-                    search_filter in window_info['process_name'].lower() or
-                    search_filter in self.create_smart_identifier(window_info)['app_type'].lower()):
-                    filtered_windows.append(window_info)
-            else:
-                filtered_windows.append(window_info)
+        filtered_windows = self.search_index.filter(search_filter)
         
         # Group windows by application
         grouped_windows = self.group_windows_by_app(filtered_windows)
         
-        # Display grouped windows
+        # Group headers, each followed by its windows unless collapsed
+        items = []
         for app_type, app_windows in sorted(grouped_windows.items()):
             if len(app_windows) == 0:
                 continue
-                
-            # App group header with collapse button
-            group_header = ctk.CTkFrame(self.window_listbox)
-            group_header.pack(fill="x", padx=5, pady=(10, 5))
-            
-            # Collapse/expand button
             is_collapsed = self.collapsed_groups.get(app_type, False)
-            collapse_btn = ctk.CTkButton(group_header, text="▶" if is_collapsed else "▼", 
-                                       width=30, height=30,
-                                       command=lambda at=app_type: self.toggle_group_collapse(at))
-            collapse_btn.pack(side="left", padx=10, pady=8)
-            
-            # App icon and name
-            app_display_name = self.get_app_display_name(app_type)
-            app_count = len(app_windows)
-            
-            header_label = ctk.CTkLabel(group_header, 
-                                      text=f"{app_display_name} ({app_count})",
-                                      font=ctk.CTkFont(size=14, weight="bold"))
-            header_label.pack(side="left", padx=5, pady=8)
-            
-            # Group select button
-            group_select_btn = ctk.CTkButton(group_header, text="Select All", width=80, height=25,
-                                           command=lambda windows=app_windows: self.select_app_group(windows))
-            group_select_btn.pack(side="right", padx=15, pady=8)
-            
-            # Individual windows in this group (only if not collapsed)
+            items.append(('group', app_type, app_windows, is_collapsed))
             if not is_collapsed:
-                for i, window_info in enumerate(app_windows):
-                    self.create_window_entry(window_info, i, len(app_windows))
+                items.extend(('window', window_info) for window_info in app_windows)
+        self.window_list.set_items(items)
         
         # Update selection label
         try:
             self.update_selection_label()
         except:
             pass  # Selection label might not exist yet
-        
-        # Update layouts display if we're on that tab
-        try:
-            self.refresh_layouts_display()
-        except:
-            pass  # Layouts tab might not be created yet
     
     def on_window_select(self, hwnd):
         """Handle window selection"""
-        if hwnd in self.selected_windows:
-            self.selected_windows.remove(hwnd)
-        else:
-            self.selected_windows.append(hwnd)
-        
-        # Update selection label
+        self.selection.toggle(hwnd)
+    
+    def on_selection_changed(self):
+        """Repaint checkboxes and the count once per selection change"""
         try:
+            self.window_list.refresh_selection()
             self.update_selection_label()
-        except:
-            pass
+        except AttributeError:
+            pass  # Widgets might not exist yet
     
     def get_selected_windows(self):
         """Get currently selected windows"""
-        return self.selected_windows
+        return self.selection.hwnds()
     
     def apply_position(self):
         """Apply custom position to selected windows"""
@@ -595,11 +3168,14 @@ class WindowResizerTool:
             y = int(self.y_entry.get()) if self.y_entry.get() else 100
             width = int(self.width_entry.get()) if self.width_entry.get() else 800
             height = int(self.height_entry.get()) if self.height_entry.get() else 600
-            
-            for hwnd in selected:
-                self.move_window(hwnd, x, y, width, height)
         except ValueError:
             messagebox.showerror("Invalid Input", "Please enter valid numbers")
+            return
+        
+        transaction = self.begin_moves()
+        for hwnd in selected:
+            transaction.move(hwnd, x, y, width, height)
+        self.commit_moves(transaction)
     
     def quick_position(self, position):
         """Apply quick position to selected windows"""
@@ -623,27 +3199,22 @@ class WindowResizerTool:
                            self.screen_width // 2, self.screen_height // 2)
         }
         
+        transaction = self.begin_moves()
         for hwnd in selected:
             if position == "minimize":
                 try:
-                    win32gui.ShowWindow(hwnd, win32con.SW_MINIMIZE)
+                    self.backend.show_window(hwnd, "minimize")
                 except Exception as e:
                     print(f"Failed to minimize window: {e}")
             elif position == "restore":
                 try:
-                    win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
+                    self.backend.show_window(hwnd, "restore")
                 except Exception as e:
                     print(f"Failed to restore window: {e}")
             elif position in positions:
                 x, y, width, height = positions[position]
-                self.move_window(hwnd, x, y, width, height)
-    
-    def move_window(self, hwnd, x, y, width, height):
-        """Move and resize a window"""
-        try:
-            win32gui.SetWindowPos(hwnd, win32con.HWND_TOP, x, y, width, height, 0)
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to move window: {str(e)}")
+                transaction.move(hwnd, x, y, width, height)
+        self.commit_moves(transaction)
     
     def save_layout(self):
         """Save current window positions as a smart layout"""
@@ -665,17 +3236,11 @@ class WindowResizerTool:
         
         layout_data = {}
         for hwnd in selected:
-            # Find window info
-            window_info = None
-            for w in self.windows:
-                if w['hwnd'] == hwnd:
-                    window_info = w
-                    break
-            
+            window_info = self.registry.get(hwnd)
             if window_info:
-                identifier = self.create_smart_identifier(window_info)
+                identifier = self.registry.identifier(window_info)
                 layout_data[f"window_{len(layout_data)}"] = {
-                    "identifier": identifier,
+                    "identifier": identifier.to_dict(),
                     "position": {
                         "x": window_info['rect'][0],
                         "y": window_info['rect'][1], 
@@ -685,8 +3250,8 @@ class WindowResizerTool:
                 }
         
         if layout_data:
-            self.layouts[layout_name] = layout_data
-            self.save_layouts()
+            if not self.store_layout(layout_name, layout_data):
+                return
             messagebox.showinfo("Success", f"Smart layout '{layout_name}' saved with {len(layout_data)} windows!")
             self.layout_name_entry.delete(0, "end")
             
@@ -712,9 +3277,7 @@ class WindowResizerTool:
         layout_frame = ctk.CTkScrollableFrame(dialog, height=200)
         layout_frame.pack(fill="both", expand=True, padx=20, pady=10)
         
-        current_windows = self.get_windows()
-        
-        for layout_name, layout_data in self.layouts.items():
+        for layout_name in self.layouts:
             # Create layout entry with match preview
             layout_entry = ctk.CTkFrame(layout_frame)
             layout_entry.pack(fill="x", pady=5)
@@ -725,15 +3288,14 @@ class WindowResizerTool:
             btn.pack(side="left", padx=5)
             
             # Match preview
-            matches = 0
-            total = len(layout_data)
-            for window_key, window_data in layout_data.items():
-                if 'identifier' in window_data:
-                    match, score = self.match_window_smart(window_data['identifier'], current_windows)
-                    if score >= self.match_threshold.get():
-                        matches += 1
+            preview = self.preview_layout_matches(layout_name)
+            matches = len(preview.matched)
+            total = self.layouts.entry_count(layout_name)
             
             match_text = f"Matches: {matches}/{total}"
+            # Entries with a near-equal unclaimed candidate may land on the wrong window
+            if preview.ambiguous:
+                match_text += f" ({len(preview.ambiguous)} ambiguous)"
             match_color = "green" if matches == total else "yellow" if matches > 0 else "red"
             
             match_label = ctk.CTkLabel(layout_entry, text=match_text, text_color=match_color)
@@ -741,40 +3303,64 @@ class WindowResizerTool:
         
         ctk.CTkButton(dialog, text="Cancel", command=dialog.destroy).pack(pady=20)
     
+    def apply_layout(self, layout_name):
+        """Match a saved layout against the current snapshot and move the windows; returns the result message"""
+        threshold = self.match_threshold.get()
+        fingerprint = self.snapshot.fingerprint
+        
+        if self.applied_layouts.get(layout_name) == (threshold, fingerprint):
+            return f"Layout '{layout_name}' is already applied.\nNo windows needed to move."
+        
+        # Smart matching, each window is claimed by at most one entry
+        matched, unmatched, _ = self.preview_layout_matches(layout_name)
+        
+        transaction = self.begin_moves()
+        for window_data, match, score in matched:
+            pos = window_data['position']
+            transaction.move(match['hwnd'], pos['x'], pos['y'], pos['width'], pos['height'], match['rect'])
+        failures = self.commit_moves(transaction)
+        moved_count = len(transaction) - len(failures)
+        skipped_count = len(transaction.skipped)
+        failed_matches = [window_data['identifier']['original_title'] for window_data in unmatched]
+        
+        # Remember how the desktop looks now so re-applying is detected up front
+        if not failures:
+            for window_data, match, score in matched:
+                if match['hwnd'] in transaction.moves:
+                    x, y, width, height = transaction.moves[match['hwnd']]
+                    fingerprint ^= self.window_fingerprint(match['hwnd'], match['title'], match['rect'])
+                    fingerprint ^= self.window_fingerprint(match['hwnd'], match['title'],
+                                                           (x, y, x + width, y + height))
+            self.applied_layouts[layout_name] = (threshold, fingerprint)
+        
+        result_msg = (f"Layout '{layout_name}' loaded!\nApplied to {moved_count + skipped_count} windows "
+                      f"({moved_count} moved, {skipped_count} already in place).")
+        if failed_matches:
+            result_msg += f"\n\nCouldn't match {len(failed_matches)} windows:\n" + "\n".join(failed_matches[:3])
+            if len(failed_matches) > 3:
+                result_msg += f"\n... and {len(failed_matches) - 3} more"
+        return result_msg
+    
+    def layout_changed(self, layout_name):
+        """Forget everything derived from a layout after it was saved or deleted"""
+        self.layout_revisions[layout_name] = self.layout_revisions.get(layout_name, 0) + 1
+        self.applied_layouts.pop(layout_name, None)
+        self.match_cache.invalidate_layout(layout_name)
+    
+    def preview_layout_matches(self, layout_name):
+        """match_layout for a saved layout against the current snapshot, cached"""
+        return self.match_saved_layout(layout_name, self.layout_revisions.get(layout_name, 0),
+                                       lambda: self.layouts[layout_name], self.snapshot,
+                                       self.match_threshold.get())
+    
     def load_layout(self, layout_name, dialog):
         """Load a saved layout using smart matching"""
         if layout_name not in self.layouts:
             messagebox.showerror("Error", "Layout not found")
             return
         
-        layout_data = self.layouts[layout_name]
-        current_windows = self.get_windows()
-        
-        applied_count = 0
-        failed_matches = []
-        
-        for window_key, window_data in layout_data.items():
-            if 'identifier' in window_data:
-                # Smart matching
-                match, score = self.match_window_smart(window_data['identifier'], current_windows)
-                
-                if match and score >= self.match_threshold.get():
-                    pos = window_data['position']
-                    self.move_window(match['hwnd'], pos['x'], pos['y'], pos['width'], pos['height'])
-                    applied_count += 1
-                else:
-                    failed_matches.append(window_data['identifier']['original_title'])
-        
         dialog.destroy()
-        
-        # Show results
-        result_msg = f"Layout '{layout_name}' loaded!\nApplied to {applied_count} windows."
-        if failed_matches:
-            result_msg += f"\n\nCouldn't match {len(failed_matches)} windows:\n" + "\n".join(failed_matches[:3])
-            if len(failed_matches) > 3:
-                result_msg += f"\n... and {len(failed_matches) - 3} more"
-        
-        messagebox.showinfo("Smart Layout Loaded", result_msg)
+        self.load_layout_direct(layout_name)
     
     def load_layout_direct(self, layout_name):
         """Load a layout directly without dialog"""
@@ -782,35 +3368,22 @@ class WindowResizerTool:
             messagebox.showerror("Error", "Layout not found")
             return
         
-        layout_data = self.layouts[layout_name]
-        current_windows = self.get_windows()
-        
-        applied_count = 0
-        failed_matches = []
-        
-        for window_key, window_data in layout_data.items():
-            if 'identifier' in window_data:
-                # Smart matching
-                match, score = self.match_window_smart(window_data['identifier'], current_windows)
-                
-                if match and score >= self.match_threshold.get():
-                    pos = window_data['position']
-                    self.move_window(match['hwnd'], pos['x'], pos['y'], pos['width'], pos['height'])
-                    applied_count += 1
-                else:
-                    failed_matches.append(window_data['identifier']['original_title'])
+        # Windows may have changed since the last snapshot; match against a
+        # fresh one, taken by the background worker
+        self.snapshot_worker.request(lambda snapshot: self.finish_load_layout(layout_name, snapshot))
+    
+    def finish_load_layout(self, layout_name, snapshot):
+        """Apply a layout once the worker has a fresh snapshot"""
+        if layout_name not in self.layouts:
+            return  # Deleted while the snapshot was taken
+        self.show_snapshot(snapshot)
+        result_msg = self.apply_layout(layout_name)
         
         # Show results
-        result_msg = f"Layout '{layout_name}' loaded!\nApplied to {applied_count} windows."
-        if failed_matches:
-            result_msg += f"\n\nCouldn't match {len(failed_matches)} windows:\n" + "\n".join(failed_matches[:3])
-            if len(failed_matches) > 3:
-                result_msg += f"\n... and {len(failed_matches) - 3} more"
-        
         messagebox.showinfo("Smart Layout Loaded", result_msg)
         
-        # Refresh layouts display
-        self.refresh_layouts_display()
+        # Pick up the new window positions, which also refreshes the layout cards
+        self.refresh_windows()
     
     def show_delete_layout_dialog(self):
         """Show dialog to delete a layout"""
@@ -838,138 +3411,157 @@ class WindowResizerTool:
     def delete_layout(self, layout_name, dialog):
         """Delete a saved layout"""
         if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete layout '{layout_name}'?"):
-            del self.layouts[layout_name]
-            self.save_layouts()
+            if not self.store_layout(layout_name, None):
+                return
             dialog.destroy()
             messagebox.showinfo("Success", f"Layout '{layout_name}' deleted!")
     
     def delete_layout_direct(self, layout_name):
         """Delete a layout directly with confirmation"""
         if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete layout '{layout_name}'?"):
-            del self.layouts[layout_name]
-            self.save_layouts()
+            if not self.store_layout(layout_name, None):
+                return
             messagebox.showinfo("Success", f"Layout '{layout_name}' deleted!")
             self.refresh_layouts_display()
     
     def load_layouts(self):
-        """Load layouts from file"""
-        try:
-            if os.path.exists(self.layouts_file):
-                with open(self.layouts_file, 'r') as f:
-                    return json.load(f)
-        except Exception:
-            pass
-        return {}
+        """Open the layout library (JSON file, or SQLite database if selected)"""
+        if self.layout_storage == "sqlite":
+            return SQLiteLayoutStore(self.layouts_db, import_from=self.layouts_file)
+        return JournaledLayoutStore(self.layouts_file)
     
-    def save_layouts(self):
-        """Save layouts to file"""
+    def store_layout(self, layout_name, layout_data):
+        """Save one layout, or delete it if layout_data is None; returns success"""
         try:
-            with open(self.layouts_file, 'w') as f:
-                json.dump(self.layouts, f, indent=2)
+            if layout_data is None:
+                del self.layouts[layout_name]
+            else:
+                self.layouts[layout_name] = layout_data
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save layouts: {str(e)}")
+            return False
+        finally:
+            self.layout_changed(layout_name)
+        return True
     
     def run(self):
         """Start the application"""
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            self.snapshot_worker.stop_tracking()
+            self.layouts.close()
     
     def on_search_change(self, event=None):
         """Handle search input changes"""
-        search_term = self.search_entry.get().lower()
-        self.refresh_windows(search_filter=search_term)
+        # Filter at most once per debounce interval while typing
+        self.scheduler.submit('window-list', self.apply_search, delay_ms=self.search_debounce_ms)
+    
+    def apply_search(self):
+        """Filter the captured window snapshot with the current search text"""
+        self.update_window_list(self.search_entry.get().lower())
     
     def toggle_select_all(self):
         """Toggle selection of all visible windows"""
         select_all = self.select_all_var.get()
         
-        for hwnd, checkbox in self.window_checkboxes.items():
-            if select_all:
-                if hwnd not in self.selected_windows:
-                    self.selected_windows.append(hwnd)
-                checkbox.select()
-            else:
-                if hwnd in self.selected_windows:
-                    self.selected_windows.remove(hwnd)
-                checkbox.deselect()
-        
-        self.update_selection_label()
+        # Covers rows scrolled out of view, not just the rendered checkboxes
+        if select_all:
+            self.selection.select(self.window_list.window_hwnds())
+        else:
+            self.selection.deselect(self.window_list.window_hwnds())
+    
+    def invert_selection(self):
+        """Invert the selection of all listed windows"""
+        self.selection.invert(self.window_list.window_hwnds())
     
     def update_selection_label(self):
         """Update the selection count label"""
-        count = len(self.selected_windows)
+        count = len(self.selection)
         self.selection_label.configure(text=f"{count} window{'s' if count != 1 else ''} selected")
     
     def update_threshold_label(self, value):
         """Update threshold percentage label"""
         self.threshold_label.configure(text=f"{int(value)}%")
+        # Match counts depend on the threshold; recount once the slider settles
+        self.refresh_layouts_display(delay_ms=150)
+    
+    def refresh_layouts_display(self, delay_ms=0):
+        """Refresh the layouts display, superseding any refresh still pending"""
+        self.scheduler.submit('layout-previews', self.render_layout_cards, 'preview', delay_ms)
     
-    def refresh_layouts_display(self):
-        """Refresh the layouts display"""
-        # Clear existing layout widgets
-        for widget in self.layouts_listbox.winfo_children():
-            widget.destroy()
+    def render_layout_cards(self):
+        """Bring the layout cards up to date, yielding after each so a newer refresh can supersede it"""
+        for layout_name in [name for name in self.layout_cards if name not in self.layouts]:
+            self.layout_cards.pop(layout_name)[0].destroy()
         
         if not self.layouts:
-            no_layouts_label = ctk.CTkLabel(self.layouts_listbox, 
-                                          text="No saved layouts found.\nCreate your first layout in the Windows tab!",
-                                          font=ctk.CTkFont(size=14),
-                                          text_color="gray")
-            no_layouts_label.pack(pady=50)
+            if self.no_layouts_label is None:
+                self.no_layouts_label = ctk.CTkLabel(self.layouts_listbox, 
+                                                     text="No saved layouts found.\nCreate your first layout in the Windows tab!",
+                                                     font=ctk.CTkFont(size=14),
+                                                     text_color="gray")
+                self.no_layouts_label.pack(pady=50)
             return
+        if self.no_layouts_label is not None:
+            self.no_layouts_label.destroy()
+            self.no_layouts_label = None
         
-        current_windows = self.get_windows()
-        
-        for layout_name, layout_data in self.layouts.items():
-            # Create layout card
-            layout_card = ctk.CTkFrame(self.layouts_listbox)
-            layout_card.pack(fill="x", padx=10, pady=8)
-            
-            # Layout header
-            header_frame = ctk.CTkFrame(layout_card)
-            header_frame.pack(fill="x", padx=15, pady=15)
-            
-            # Layout name and info
-            name_frame = ctk.CTkFrame(header_frame)
-            name_frame.pack(fill="x")
-            
-            name_label = ctk.CTkLabel(name_frame, text=f"📋 {layout_name}", 
-                                    font=ctk.CTkFont(size=16, weight="bold"))
-            name_label.pack(side="left", padx=10, pady=5)
+        # Layouts may be saved or deleted between steps
+        for layout_name in list(self.layouts):
+            if layout_name not in self.layouts:
+                continue
+            if layout_name not in self.layout_cards:
+                self.layout_cards[layout_name] = self.create_layout_card(layout_name)
+            _, match_label, details_label = self.layout_cards[layout_name]
             
             # Calculate matches
-            matches = 0
-            total = len(layout_data)
-            for window_key, window_data in layout_data.items():
-                if 'identifier' in window_data:
-                    match, score = self.match_window_smart(window_data['identifier'], current_windows)
-                    if score >= self.match_threshold.get():
-                        matches += 1
+            matches = len(self.preview_layout_matches(layout_name).matched)
+            total = self.layouts.entry_count(layout_name)
             
             # Match status
-            match_text = f"{matches}/{total} matches"
             match_color = "#00ff00" if matches == total else "#ffaa00" if matches > 0 else "#ff6666"
-            
-            match_label = ctk.CTkLabel(name_frame, text=match_text, 
-                                     text_color=match_color, font=ctk.CTkFont(weight="bold"))
-            match_label.pack(side="right", padx=10, pady=5)
-            
-            # Action buttons
-            btn_frame = ctk.CTkFrame(header_frame)
-            btn_frame.pack(fill="x", pady=(10, 0))
-            
-            load_btn = ctk.CTkButton(btn_frame, text="📂 Load", width=80, height=30,
-                                   command=lambda name=layout_name: self.load_layout_direct(name))
-            load_btn.pack(side="left", padx=5)
-            
-            delete_btn = ctk.CTkButton(btn_frame, text="🗑️ Delete", width=80, height=30,
-                                     command=lambda name=layout_name: self.delete_layout_direct(name))
-            delete_btn.pack(side="right", padx=5)
-            
-            # Layout details (expandable)
-            details_text = f"Contains {total} window configurations"
-            details_label = ctk.CTkLabel(header_frame, text=details_text, 
-                                       font=ctk.CTkFont(size=11), text_color="gray")
-            details_label.pack(pady=(5, 0))
+            match_label.configure(text=f"{matches}/{total} matches", text_color=match_color)
+            details_label.configure(text=f"Contains {total} window configurations")
+            yield
+    
+    def create_layout_card(self, layout_name):
+        """Build the card for one layout; returns (card, match label, details label)"""
+        layout_card = ctk.CTkFrame(self.layouts_listbox)
+        layout_card.pack(fill="x", padx=10, pady=8)
+        
+        # Layout header
+        header_frame = ctk.CTkFrame(layout_card)
+        header_frame.pack(fill="x", padx=15, pady=15)
+        
+        # Layout name and info
+        name_frame = ctk.CTkFrame(header_frame)
+        name_frame.pack(fill="x")
+        
+        name_label = ctk.CTkLabel(name_frame, text=f"📋 {layout_name}", 
+                                font=ctk.CTkFont(size=16, weight="bold"))
+        name_label.pack(side="left", padx=10, pady=5)
+        
+        match_label = ctk.CTkLabel(name_frame, text="", font=ctk.CTkFont(weight="bold"))
+        match_label.pack(side="right", padx=10, pady=5)
+        
+        # Action buttons
+        btn_frame = ctk.CTkFrame(header_frame)
+        btn_frame.pack(fill="x", pady=(10, 0))
+        
+        load_btn = ctk.CTkButton(btn_frame, text="📂 Load", width=80, height=30,
+                               command=lambda name=layout_name: self.load_layout_direct(name))
+        load_btn.pack(side="left", padx=5)
+        
+        delete_btn = ctk.CTkButton(btn_frame, text="🗑️ Delete", width=80, height=30,
+                                 command=lambda name=layout_name: self.delete_layout_direct(name))
+        delete_btn.pack(side="right", padx=5)
+        
+        # Layout details (expandable)
+        details_label = ctk.CTkLabel(header_frame, text="", 
+                                   font=ctk.CTkFont(size=11), text_color="gray")
+        details_label.pack(pady=(5, 0))
+        return layout_card, match_label, details_label
     
     def get_app_display_name(self, app_type):
         """Get a friendly display name for the app type"""
@@ -997,34 +3589,19 @@ class WindowResizerTool:
             'sublime': '✨ Sublime Text',
             'git': '🐙 Git'
         }
+        if app_type in self.app_classifier.display_names:
+            return self.app_classifier.display_names[app_type]
         return display_names.get(app_type, f"📱 {app_type.title()}")
     
-    def create_window_entry(self, window_info, index, total_in_group):
-        """Create an individual window entry with improved styling"""
-        # Create window entry frame
-        window_entry = ctk.CTkFrame(self.window_listbox)
-        window_entry.pack(fill="x", padx=15, pady=2)
-        
-        # Checkbox
-        checkbox = ctk.CTkCheckBox(window_entry, text="", 
-                                 command=lambda h=window_info['hwnd']: self.on_window_select(h))
-        checkbox.pack(side="left", padx=10, pady=8)
-        
-        # Window info container
-        info_frame = ctk.CTkFrame(window_entry)
-        info_frame.pack(side="left", fill="x", expand=True, padx=5, pady=5)
-        
+    def describe_window(self, window_info):
+        """Texts shown for a window row: (title, subtitle, size)"""
         # Main title with better truncation
         title_text = window_info['title']
         if len(title_text) > 60:
             title_text = title_text[:57] + "..."
         
-        title_label = ctk.CTkLabel(info_frame, text=title_text, 
-                                 font=ctk.CTkFont(size=12, weight="bold"))
-        title_label.pack(anchor="w", padx=10, pady=(5, 2))
-        
         # Subtitle with enhanced info
-        identifier = self.create_smart_identifier(window_info)
+        identifier = self.registry.identifier(window_info)
         clean_title = identifier.get('clean_title', '')
         if clean_title and clean_title != window_info['title']:
             if len(clean_title) > 40:
@@ -1033,48 +3610,25 @@ class WindowResizerTool:
         else:
             subtitle = f"{window_info['process_name']} • PID: {window_info['pid']}"
         
-        subtitle_label = ctk.CTkLabel(info_frame, text=subtitle, 
-                                    font=ctk.CTkFont(size=10), 
-                                    text_color="gray")
-        subtitle_label.pack(anchor="w", padx=10, pady=(0, 5))
-        
         # Window size info
         size_text = f"{window_info['width']}×{window_info['height']} at ({window_info['rect'][0]}, {window_info['rect'][1]})"
-        size_label = ctk.CTkLabel(window_entry, text=size_text, 
-                                font=ctk.CTkFont(size=9), 
-                                text_color="lightgray")
-        size_label.pack(side="right", padx=10, pady=8)
-        
-        self.window_checkboxes[window_info['hwnd']] = checkbox
-        
-        # If this window is already selected, check the box
-        if window_info['hwnd'] in self.selected_windows:
-            checkbox.select()
+        return title_text, subtitle, size_text
     
-    def select_app_group(self, app_windows):
-        """Select all windows in an application group"""
-        for window_info in app_windows:
-            hwnd = window_info['hwnd']
-            if hwnd not in self.selected_windows:
-                self.selected_windows.append(hwnd)
-                if hwnd in self.window_checkboxes:
-                    self.window_checkboxes[hwnd].select()
-        
-        self.update_selection_label()
+    def select_app_group(self, app_type):
+        """Select the windows of an application group that the search shows"""
+        shown = {window_info.hwnd for window_info in self.search_index.filter(self.search_entry.get())}
+        self.selection.select(hwnd for hwnd in self.registry.hwnds_for_app(app_type) if hwnd in shown)
 
     def group_windows_by_app(self, windows):
-        """Group windows by application for better organization"""
+        """Group windows by application, from the registry's app_type index"""
+        shown = {window_info.hwnd for window_info in windows}
         groups = {}
-        for window_info in windows:
-            identifier = self.create_smart_identifier(window_info)
-            app_type = identifier['app_type']
-            
-            if app_type not in groups:
-                groups[app_type] = []
-            groups[app_type].append(window_info)
-        
+        for app_type, hwnds in self.registry.by_app_type.items():
+            app_windows = [self.registry.records[hwnd] for hwnd in hwnds if hwnd in shown]
+            if app_windows:
+                groups[app_type] = app_windows
         return groups
 
 if __name__ == "__main__":
-    app = WindowResizerTool()
+    app = WindowResizerTool(layout_storage="sqlite" if "--sqlite" in sys.argv else "json")
     app.run()
\ No newline at end of file
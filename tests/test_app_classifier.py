@@ -0,0 +1,43 @@
+import random
+
+import pytest
+
+from main import DEFAULT_APP_RULES, SIMULATED_APPS, AppClassifier
+
+
+def ordered_loop(rules, process_base, title_lower):
+    """The rule loop AppClassifier replaces: first rule with a keyword in either string"""
+    for rule in rules:
+        for keyword in rule['keywords']:
+            keyword = keyword.lower()
+            if keyword and (keyword in process_base or keyword in title_lower):
+                return rule['app_type']
+    return None
+
+
+# Shorter keywords of later rules that prefix, overlap or sit inside longer ones
+PREFIX_RULES = [
+    {"app_type": "late", "keywords": ["code"]},
+    {"app_type": "first", "keywords": ["visual studio", "cod"]},
+    {"app_type": "middle", "keywords": ["visual", "studio code", "od"]},
+    {"app_type": "last", "keywords": ["c", "isual"]},
+]
+
+
+def samples(rules, rng, count):
+    keywords = [keyword for rule in rules for keyword in rule['keywords']]
+    words = keywords + ["notes", "window", "x", "visua", "studi", ""]
+    for _ in range(count):
+        yield (" ".join(rng.choice(words) for _ in range(rng.randint(0, 2))),
+               " ".join(rng.choice(words) for _ in range(rng.randint(0, 4))))
+
+
+@pytest.mark.parametrize("rules", [DEFAULT_APP_RULES, PREFIX_RULES], ids=["default", "prefixes"])
+def test_matches_ordered_rule_loop(rules):
+    classifier = AppClassifier(rules)
+    rng = random.Random(0)
+    cases = list(samples(rules, rng, 3000))
+    cases += [(process.lower().replace('.exe', ''), template.lower())
+              for process, _, _, templates, _ in SIMULATED_APPS for template in templates]
+    for process_base, title_lower in cases:
+        assert classifier.classify(process_base, title_lower) == ordered_loop(rules, process_base, title_lower)
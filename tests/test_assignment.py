@@ -0,0 +1,65 @@
+import itertools
+import random
+
+import pytest
+
+from main import _hungarian, _hungarian_numpy, max_weight_assignment, max_weight_assignment_matrix, np
+
+
+def brute_force(scores, rows, columns):
+    """Best total over every one-to-one assignment, rows allowed to stay unassigned"""
+    best = 0
+    for chosen in itertools.product([None] + columns, repeat=len(rows)):
+        used = [c for c in chosen if c is not None]
+        if len(used) != len(set(used)):
+            continue
+        if any(c is not None and (r, c) not in scores for r, c in zip(rows, chosen)):
+            continue
+        best = max(best, sum(scores[r, c] for r, c in zip(rows, chosen) if c is not None))
+    return best
+
+
+def random_scores(rng, n_rows, n_columns, density):
+    values = [40, 45, 60, 60, 100, 215]  # Few distinct values, so ties are common
+    return {(r, c): rng.choice(values)
+            for r in range(n_rows) for c in range(n_columns) if rng.random() < density}
+
+
+def check(assignment, scores):
+    assert len(set(assignment.values())) == len(assignment)
+    assert all((r, c) in scores for r, c in assignment.items())
+    return sum(scores[r, c] for r, c in assignment.items())
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_matches_brute_force(seed):
+    rng = random.Random(seed)
+    n_rows, n_columns = rng.randint(1, 6), rng.randint(1, 6)
+    scores = random_scores(rng, n_rows, n_columns, rng.choice([0.3, 0.6, 1.0]))
+    best = brute_force(scores, list(range(n_rows)), list(range(n_columns)))
+    assert check(max_weight_assignment(scores), scores) == best
+
+
+@pytest.mark.skipif(np is None, reason="numpy not installed")
+@pytest.mark.parametrize("seed", range(40))
+def test_matrix_version_matches_brute_force(seed):
+    rng = random.Random(seed)
+    n_rows, n_columns = rng.randint(1, 6), rng.randint(1, 6)
+    scores = random_scores(rng, n_rows, n_columns, rng.choice([0.3, 0.6, 1.0]))
+    matrix = np.zeros((n_rows, n_columns), dtype=np.int64)
+    for (r, c), score in scores.items():
+        matrix[r, c] = score
+    best = brute_force(scores, list(range(n_rows)), list(range(n_columns)))
+    assert check(max_weight_assignment_matrix(matrix), scores) == best
+
+
+@pytest.mark.skipif(np is None, reason="numpy not installed")
+@pytest.mark.parametrize("seed", range(5))
+def test_numpy_hungarian_matches_python(seed):
+    rng = random.Random(seed)
+    cost = [[-rng.choice([0, 0, 45, 60, 200, 215]) for _ in range(60)] for _ in range(40)]
+    assert _hungarian_numpy(cost) == _hungarian(cost)
+
+
+def test_empty():
+    assert max_weight_assignment({}) == {}
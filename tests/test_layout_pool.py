@@ -0,0 +1,74 @@
+import json
+
+from main import JournaledLayoutStore, LayoutPool, SimulatedBackend, WindowManagerCore
+
+
+def library():
+    core = WindowManagerCore(SimulatedBackend.synthetic(30, seed=3))
+    windows = core.get_windows()
+    
+    def entry(window, x):
+        return {"identifier": core.create_smart_identifier(window).to_dict(),
+                "position": {"x": x, "y": 10, "width": window.width, "height": window.height}}
+    
+    return {
+        "work": {f"window_{i}": entry(w, i) for i, w in enumerate(windows[:10])},
+        "play": {f"window_{i}": entry(w, 0) for i, w in enumerate(windows[5:15])},
+        "odd": {
+            "window_0": {"identifier": {"process_name": "x.exe", "extra": [1, 2]},
+                         "position": {"x": 1, "y": 2, "width": 3, "height": 4}},
+            "window_1": {"identifier": entry(windows[0], 0)["identifier"], "position": {"x": 1}, "note": "kept"},
+            "window_2": {"identifier": dict(entry(windows[1], 0)["identifier"], process_pid=None),
+                         "position": {"x": 1, "y": 2, "width": 3, "height": 4}},
+        },
+    }
+
+
+def round_trip(layouts):
+    return LayoutPool().decode(json.loads(json.dumps(LayoutPool.encode(layouts))))
+
+
+def test_encode_decode_round_trip():
+    layouts = library()
+    assert round_trip(layouts) == layouts
+
+
+def test_shared_windows_are_stored_once():
+    layouts = library()
+    data = LayoutPool.encode(layouts)
+    assert data["format"] == LayoutPool.FORMAT
+    assert len(data["strings"]) == len(set(data["strings"]))
+    # Windows 5-9 are saved in both "work" and "play"
+    identifiers = {json.dumps(entry["identifier"], sort_keys=True)
+                   for layout in layouts.values() for entry in layout.values()}
+    assert len(data["identifiers"]) == len(identifiers)
+    assert sum(len(layout) for layout in layouts.values()) - len(identifiers) >= 5
+
+
+def test_decoded_layouts_share_identifiers_and_strings():
+    layouts = round_trip(library())
+    shared = layouts["odd"]["window_1"]["identifier"]
+    assert shared is layouts["work"]["window_0"]["identifier"]
+    exe_paths = [entry["identifier"]["exe_path"] for entry in layouts["work"].values()]
+    for a in exe_paths:
+        for b in exe_paths:
+            assert a != b or a is b
+
+
+def test_plain_format_still_loads():
+    layouts = library()
+    assert LayoutPool().decode(json.loads(json.dumps(layouts))) == layouts
+
+
+def test_store_rewrites_plain_file_pooled(tmp_path):
+    path = str(tmp_path / "layouts.json")
+    layouts = library()
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(layouts, f, indent=2)
+    
+    store = JournaledLayoutStore(path)
+    assert dict(store) == layouts
+    store.compact()
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f)["format"] == LayoutPool.FORMAT
+    assert dict(JournaledLayoutStore(path)) == layouts
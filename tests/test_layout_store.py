@@ -0,0 +1,79 @@
+import json
+import os
+
+from main import JournaledLayoutStore
+
+
+def layout(x):
+    return {"window_0": {"identifier": {"app_type": "notepad", "process_name": "notepad.exe"},
+                         "position": {"x": x, "y": 0, "width": 800, "height": 600}}}
+
+
+def test_saves_survive_reload(tmp_path):
+    path = str(tmp_path / "layouts.json")
+    store = JournaledLayoutStore(path)
+    store["a"] = layout(1)
+    store["b"] = layout(2)
+    store["a"] = layout(3)
+    del store["b"]
+    
+    reloaded = JournaledLayoutStore(path)
+    assert dict(reloaded) == {"a": layout(3)}
+    assert not os.path.exists(path)  # Nothing compacted yet, all in the journal
+
+
+def test_torn_last_record_is_dropped_and_cut(tmp_path):
+    path = str(tmp_path / "layouts.json")
+    store = JournaledLayoutStore(path)
+    store["a"] = layout(1)
+    with open(store.journal_path, 'ab') as f:
+        f.write(b'{"op": "put", "name": "b", "lay')
+    
+    reloaded = JournaledLayoutStore(path)
+    assert list(reloaded) == ["a"]
+    with open(store.journal_path, 'rb') as f:
+        assert f.read().endswith(b"\n")
+    reloaded["c"] = layout(2)
+    assert list(JournaledLayoutStore(path)) == ["a", "c"]
+
+
+def test_bad_complete_records_are_skipped(tmp_path):
+    path = str(tmp_path / "layouts.json")
+    lines = [{"op": "put", "name": "a", "layout": layout(1)}, {"op": "put", "layout": layout(2)},
+             "oops", {"op": "put", "name": "b", "layout": layout(3)}]
+    with open(path + ".journal", 'w', encoding='utf-8') as f:
+        f.write("".join(json.dumps(line) + "\n" for line in lines))
+    
+    assert dict(JournaledLayoutStore(path)) == {"a": layout(1), "b": layout(3)}
+    assert dict(JournaledLayoutStore(path)) == {"a": layout(1), "b": layout(3)}
+
+
+def test_compaction_replaces_snapshot_and_empties_journal(tmp_path):
+    path = str(tmp_path / "layouts.json")
+    store = JournaledLayoutStore(path, compact_min_bytes=2000)
+    for i in range(20):
+        store[f"layout {i}"] = layout(i)
+    assert os.path.exists(path)
+    assert store.journal_bytes < 2000
+    assert os.path.getsize(store.journal_path) == store.journal_bytes
+    
+    store.compact()
+    assert os.path.getsize(store.journal_path) == 0
+    assert not os.path.exists(path + ".tmp")
+    assert dict(JournaledLayoutStore(path)) == {f"layout {i}": layout(i) for i in range(20)}
+
+
+
+def test_failed_compaction_keeps_the_save(tmp_path, monkeypatch):
+    path = str(tmp_path / "layouts.json")
+    store = JournaledLayoutStore(path, compact_min_bytes=0)
+    
+    def fail():
+        raise OSError("disk full")
+    
+    monkeypatch.setattr(store, "compact", fail)
+    store["a"] = layout(1)
+    del store["a"]
+    store["b"] = layout(2)
+    assert dict(store) == {"b": layout(2)}
+    assert dict(JournaledLayoutStore(path)) == {"b": layout(2)}
@@ -0,0 +1,65 @@
+import pytest
+
+from main import SimulatedBackend, WindowManagerCore, np
+
+
+def twin_desktop(count):
+    """count identical Notepad windows of one process"""
+    backend = SimulatedBackend()
+    backend.add_process(1000, "notepad.exe", r"C:\Windows\notepad.exe")
+    for n in range(count):
+        backend.add_window("notes.txt - Notepad", 1000, "Notepad", (100 * n, 0, 100 * n + 800, 600))
+    return WindowManagerCore(backend)
+
+
+def twin_layout(core, windows):
+    return {f"window_{i}": {"identifier": core.create_smart_identifier(w).to_dict()}
+            for i, w in enumerate(windows)}
+
+
+@pytest.fixture(params=["python", "numpy"])
+def vectorize(request, monkeypatch):
+    import main
+    if request.param == "numpy":
+        if np is None:
+            pytest.skip("numpy not installed")
+        monkeypatch.setattr(main, "VECTORIZE_MIN_PAIRS", 0)
+    else:
+        monkeypatch.setattr(main, "VECTORIZE_MIN_PAIRS", float("inf"))
+
+
+def test_twins_the_assignment_separates_are_not_ambiguous(vectorize):
+    core = twin_desktop(2)
+    windows = core.get_windows()
+    session = core.create_match_session(windows)
+    result = core.match_layout(twin_layout(core, windows), session, 40)
+    assert len(result.matched) == 2
+    assert result.unmatched == []
+    assert result.ambiguous == []
+
+
+def test_spare_twin_makes_entry_ambiguous(vectorize):
+    core = twin_desktop(3)
+    windows = core.get_windows()
+    session = core.create_match_session(windows)
+    layout = twin_layout(core, windows[:2])
+    result = core.match_layout(layout, session, 40)
+    assert len(result.matched) == 2
+    assert len(result.ambiguous) == 2
+
+
+def test_row_scores_match_pairwise_scores():
+    core = WindowManagerCore(SimulatedBackend.synthetic(120, seed=3))
+    session = core.create_match_session(core.get_windows())
+    saved = WindowManagerCore(SimulatedBackend.synthetic(40, seed=4))
+    identifiers = [saved.create_smart_identifier(w).to_dict() for w in saved.get_windows()]
+    identifiers += [core.create_smart_identifier(w).to_dict() for w in session.windows[:10]]
+    
+    for identifier in identifiers:
+        clean_title, keywords = session.query(identifier)
+        expected = {}
+        for position in session.index.candidates(identifier):
+            score = session.score(identifier, clean_title, keywords, position)
+            if score > 0 and score >= 40:
+                expected[position] = score
+        assert session.row_scores(identifier, 40) == expected
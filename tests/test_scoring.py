@@ -0,0 +1,40 @@
+import pytest
+
+from main import SimulatedBackend, VectorizedScorer, WindowManagerCore, np
+
+pytestmark = pytest.mark.skipif(np is None, reason="numpy not installed")
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_numpy_scores_match_python(seed):
+    core = WindowManagerCore(SimulatedBackend.synthetic(150, seed=seed))
+    session = core.create_match_session(core.get_windows())
+    # Layouts saved on an earlier desktop: similar apps, different windows
+    saved = WindowManagerCore(SimulatedBackend.synthetic(80, seed=seed + 100))
+    identifiers = [saved.create_smart_identifier(w) for w in saved.get_windows()]
+    # Plus windows saved from this very desktop, for exact-title matches
+    identifiers += [core.create_smart_identifier(w) for w in session.windows[:20]]
+    identifiers = [identifier.to_dict() for identifier in identifiers]
+    
+    python_scores = []
+    for identifier in identifiers:
+        clean_title, keywords = session.query(identifier)
+        python_scores.append([session.score(identifier, clean_title, keywords, position)
+                              for position in range(len(session.windows))])
+    
+    assert np.array_equal(VectorizedScorer(session).score_matrix(identifiers), np.array(python_scores))
+
+
+def test_matching_agrees_with_and_without_numpy(monkeypatch):
+    import main
+    core = WindowManagerCore(SimulatedBackend.synthetic(300, seed=5))
+    session = core.create_match_session(core.get_windows())
+    layout = {f"window_{i}": {"identifier": core.create_smart_identifier(w).to_dict()}
+              for i, w in enumerate(session.windows[::3])}
+    
+    monkeypatch.setattr(main, "VECTORIZE_MIN_PAIRS", 0)
+    vectorized, *_ = core.match_layout(layout, session, 40)
+    monkeypatch.setattr(main, "VECTORIZE_MIN_PAIRS", float("inf"))
+    python, *_ = core.match_layout(layout, session, 40)
+    assert sum(score for *_, score in vectorized) == sum(score for *_, score in python)
+    assert len(vectorized) == len(python)
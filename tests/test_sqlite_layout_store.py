@@ -0,0 +1,125 @@
+import sqlite3
+
+import pytest
+
+from main import JournaledLayoutStore, SQLiteLayoutStore
+
+
+def identifier(title, x=0):
+    return {"app_type": "notepad", "process_name": "notepad.exe", "class_name": "Notepad",
+            "title_keywords": ["notes"], "clean_title": "notes", "title_length": len(title),
+            "original_title": title, "process_pid": None, "exe_path": None,
+            "position_x": x, "position_y": 0}
+
+
+def layout(*titles):
+    return {f"window_{i}": {"identifier": identifier(title, 100 * i),
+                            "position": {"x": 100 * i, "y": 0, "width": 800, "height": 600}}
+            for i, title in enumerate(titles)}
+
+
+def identifier_count(store):
+    return store.db.execute("SELECT COUNT(*) FROM identifiers").fetchone()[0]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "layouts.db")
+
+
+def test_round_trip_keeps_none_values(db_path):
+    store = SQLiteLayoutStore(db_path)
+    store["a"] = layout("notes.txt - Notepad", "todo.txt - Notepad")
+    store.close()
+    
+    reloaded = SQLiteLayoutStore(db_path)
+    assert dict(reloaded) == {"a": layout("notes.txt - Notepad", "todo.txt - Notepad")}
+    assert reloaded["a"]["window_0"]["identifier"]["exe_path"] is None
+
+
+def test_imports_json_library_once(tmp_path, db_path):
+    json_path = str(tmp_path / "layouts.json")
+    journal = JournaledLayoutStore(json_path)
+    journal["a"] = layout("notes.txt - Notepad")
+    journal["b"] = layout("todo.txt - Notepad")
+    
+    store = SQLiteLayoutStore(db_path, import_from=json_path)
+    assert dict(store) == dict(JournaledLayoutStore(json_path))
+    del store["a"]
+    store.close()
+    # The marker keeps a deleted layout from being imported again
+    assert list(SQLiteLayoutStore(db_path, import_from=json_path)) == ["b"]
+
+
+def test_failed_import_is_retried(tmp_path, db_path, monkeypatch):
+    json_path = str(tmp_path / "layouts.json")
+    JournaledLayoutStore(json_path)["a"] = layout("notes.txt - Notepad")
+    
+    def fail(self, name, layout):
+        raise sqlite3.OperationalError("disk I/O error")
+    
+    with monkeypatch.context() as patch:
+        patch.setattr(SQLiteLayoutStore, "_write", fail)
+        failed = SQLiteLayoutStore(db_path, import_from=json_path)
+        assert len(failed) == 0
+        failed.close()
+    
+    assert list(SQLiteLayoutStore(db_path, import_from=json_path)) == ["a"]
+
+
+def test_layouts_load_lazily(db_path, monkeypatch):
+    store = SQLiteLayoutStore(db_path, cache_size=2)
+    for n in range(4):
+        store[f"layout {n}"] = layout(*(f"file{i}.txt - Notepad" for i in range(n + 1)))
+    store.close()
+    
+    reads = []
+    read = SQLiteLayoutStore._read
+    
+    def counting_read(self, layout_id):
+        reads.append(layout_id)
+        return read(self, layout_id)
+    
+    monkeypatch.setattr(SQLiteLayoutStore, "_read", counting_read)
+    store = SQLiteLayoutStore(db_path, cache_size=2)
+    assert list(store) == [f"layout {n}" for n in range(4)]
+    assert [store.entry_count(name) for name in store] == [1, 2, 3, 4]
+    assert reads == []
+    
+    store["layout 1"]
+    store["layout 1"]
+    store["layout 2"]
+    store["layout 3"]  # Evicts layout 1
+    store["layout 1"]
+    assert len(reads) == 4
+
+
+def test_overwrite_keeps_order_and_drops_unused_identifiers(db_path):
+    store = SQLiteLayoutStore(db_path)
+    store["a"] = layout("notes.txt - Notepad", "todo.txt - Notepad")
+    store["b"] = layout("notes.txt - Notepad")
+    store["a"] = layout("other.txt - Notepad")
+    
+    assert list(store) == ["a", "b"]
+    assert store.entry_count("a") == 1
+    assert store["a"] == layout("other.txt - Notepad")
+    # todo.txt is gone, notes.txt is still used by b
+    assert identifier_count(store) == 2
+    store.close()
+    assert dict(SQLiteLayoutStore(db_path)) == {"a": layout("other.txt - Notepad"),
+                                                "b": layout("notes.txt - Notepad")}
+
+
+def test_delete_drops_identifiers_no_layout_uses(db_path):
+    store = SQLiteLayoutStore(db_path)
+    store["a"] = layout("notes.txt - Notepad", "todo.txt - Notepad")
+    store["b"] = layout("notes.txt - Notepad")
+    assert identifier_count(store) == 2  # b shares a's notes.txt row
+    
+    del store["a"]
+    assert identifier_count(store) == 1
+    del store["b"]
+    assert identifier_count(store) == 0
+    with pytest.raises(KeyError):
+        del store["b"]
+    assert len(SQLiteLayoutStore(db_path)) == 0
@@ -0,0 +1,139 @@
+import threading
+import time
+
+import pytest
+
+from main import SimulatedBackend, SnapshotWorker, WindowManagerCore, WindowTable
+
+
+def mutate(backend):
+    """Open, close, move, retitle and hide one window each; returns their hwnds"""
+    hwnds = list(backend.windows)
+    pid = backend.windows[hwnds[0]].pid
+    added = backend.add_window("New tab - Google Chrome", pid, "Chrome_WidgetWin_1")
+    backend.remove_window(hwnds[1])
+    x, y, right, bottom = backend.windows[hwnds[2]].rect
+    backend.set_window_pos(hwnds[2], x + 25, y + 10, right - x, bottom - y)
+    backend.set_window_title(hwnds[3], "Renamed window")
+    backend.set_window_visible(hwnds[4], False)
+    return added, hwnds[1], hwnds[2], hwnds[3], hwnds[4]
+
+
+def replayed_hwnds(backend, events):
+    dirty = set()
+    backend.subscribe_events(lambda kind, hwnd: dirty.add(hwnd))
+    backend.replay(events)
+    backend.unsubscribe_events()
+    return dirty
+
+
+def test_replayed_events_update_table_like_full_refresh():
+    backend = SimulatedBackend.synthetic(40, seed=7)
+    core = WindowManagerCore(backend)
+    before = core.get_windows()
+    backend.event_log.clear()
+    added = mutate(backend)[0]
+    
+    incremental = core.update_windows(replayed_hwnds(backend, list(backend.event_log)))
+    scratch = WindowManagerCore(backend).get_windows()
+    # Events carry no z-order: new windows go on top, the rest keep their order
+    assert incremental[0].hwnd == added
+    assert {w.hwnd: dict(w) for w in incremental} == {w.hwnd: dict(w) for w in scratch}
+    assert len(incremental) == len(before) - 1
+
+
+def test_replay_produces_window_diff():
+    backend = SimulatedBackend.synthetic(40, seed=7)
+    core = WindowManagerCore(backend)
+    first = core.capture_snapshot()
+    backend.event_log.clear()
+    added, removed, moved, retitled, hidden = mutate(backend)
+    
+    snapshot = core.capture_snapshot(replayed_hwnds(backend, list(backend.event_log)))
+    assert snapshot.generation == first.generation + 1
+    assert snapshot.diff.added == (added,)
+    assert set(snapshot.diff.removed) == {removed, hidden}
+    assert set(snapshot.diff.changed) == {moved, retitled}
+    assert snapshot.diff == WindowTable.diff(first.windows, snapshot.windows)
+
+
+def test_unchanged_windows_keep_their_records():
+    backend = SimulatedBackend.synthetic(40, seed=7)
+    core = WindowManagerCore(backend)
+    first = core.capture_snapshot()
+    backend.event_log.clear()
+    _, _, moved, _, _ = mutate(backend)
+    
+    snapshot = core.capture_snapshot(replayed_hwnds(backend, list(backend.event_log)))
+    old = {w.hwnd: w for w in first.windows}
+    for window in snapshot.windows:
+        if window.hwnd in old and window.hwnd not in snapshot.diff.changed:
+            assert window is old[window.hwnd]
+    assert next(w for w in snapshot.windows if w.hwnd == moved) is not old[moved]
+
+
+def test_no_events_returns_previous_snapshot():
+    core = WindowManagerCore(SimulatedBackend.synthetic(20, seed=1))
+    first = core.capture_snapshot()
+    assert core.capture_snapshot(set()) is first
+
+
+def test_incremental_fingerprint_matches_full_hash():
+    backend = SimulatedBackend.synthetic(40, seed=7)
+    core = WindowManagerCore(backend)
+    core.capture_snapshot()
+    backend.event_log.clear()
+    mutate(backend)
+    
+    snapshot = core.capture_snapshot(replayed_hwnds(backend, list(backend.event_log)))
+    assert snapshot.fingerprint == core.desktop_fingerprint(snapshot.windows)
+
+
+def test_worker_hands_fresh_snapshot_to_request_callback():
+    backend = SimulatedBackend.synthetic(20, seed=1)
+    core = WindowManagerCore(backend)
+    worker = SnapshotWorker(core)
+    worker.request()
+    first = worker.results.get(timeout=5)
+    
+    added = backend.add_window("New tab - Google Chrome", backend.windows[next(iter(backend.windows))].pid)
+    received = []
+    worker.request(received.append)
+    deadline = time.monotonic() + 5
+    answered = []
+    while not answered and time.monotonic() < deadline:
+        answered = worker.answered()
+        time.sleep(0.01)
+    [(callback, snapshot)] = answered
+    callback(snapshot)
+    assert received == [snapshot]
+    assert snapshot.generation > first.generation
+    assert added in {w.hwnd for w in snapshot.windows}
+
+
+@pytest.mark.parametrize("fails_later", [False, True])
+def test_worker_polls_when_events_are_unavailable(fails_later):
+    backend = SimulatedBackend.synthetic(20, seed=1)
+    
+    def subscribe_events(callback, on_failure=None):
+        if not fails_later:
+            return False
+        threading.Timer(0.01, on_failure).start()
+        return True
+    
+    backend.subscribe_events = subscribe_events
+    worker = SnapshotWorker(WindowManagerCore(backend), poll_ms=20)
+    worker.start_tracking()
+    added = backend.add_window("New tab - Google Chrome", backend.windows[next(iter(backend.windows))].pid)
+    
+    deadline = time.monotonic() + 5
+    seen = set()
+    while added not in seen and time.monotonic() < deadline:
+        snapshot = worker.latest()
+        if snapshot is not None:
+            seen = {w.hwnd for w in snapshot.windows}
+        time.sleep(0.01)
+    assert added in seen
+    assert worker.polling
+    worker.stop_tracking()
+    assert not worker.polling